@@ -1,7 +1,13 @@
 import pandas as pd
 import time
 import re
+import os
+import json
+import asyncio
+import threading
+import queue
 import urllib.parse
+from collections import namedtuple
 from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -11,12 +17,81 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
+from http_session import AsyncFetcher, configure_cache, get_rate_limiter
+from email_extractor import extract_emails, merge_candidates, format_candidates
+from domain_health import get_domain_health, classify_result
+from preflight import triage_websites, summarize, is_dns_error
+from metrics import configure_metrics, get_metrics, timed
+from process_memory import process_tree_rss
 
 # Set user agent
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
 
+# Browser pool settings
+NUM_WORKERS = 1  # Number of headless Chrome instances to run in parallel
+MAX_CONSECUTIVE_ERRORS = 3  # Restart a worker's browser after this many errors in a row
+BROWSER_MEMORY_LIMIT_MB = 1500  # Restart a worker's browser once Chrome and its children use more than this
+RENDERER_TIMEOUT = 10  # Seconds a trivial script may take before the renderer counts as hung
+ROUTINE_RESTART_EVERY = 20  # Restart after this many sites, only when memory can't be measured
+PROGRESS_EVERY = 10  # Print progress after this many results
+
+# HTTP-first tier settings
+HTTP_FIRST = True  # Try plain HTTP before starting any browser
+STATIC_CONCURRENCY = 20  # Sites fetched at once in the HTTP tier
+STATIC_PER_HOST = 4  # Requests at once to any one site in the HTTP tier
+STATIC_TIMEOUT = (5, 10)  # Connect/read timeout for HTTP tier fetches
+MIN_VISIBLE_TEXT = 200  # Pages with less visible text than this are treated as JS-rendered
+BLOCKED_STATUSES = {401, 403, 429, 503}
+JS_GATE_MARKERS = (
+    'enable javascript', 'javascript is required', 'javascript must be enabled',
+    'checking your browser', 'cf-browser-verification', '__cf_chl', 'challenge-platform'
+)
+
+# Common paths where contact information might be found
+CONTACT_PATHS = [
+    '/contact', '/contact-us', '/about/contact', '/about-us/contact',
+    '/contactus', '/about', '/about-us', '/connect', '/get-in-touch',
+    '/support', '/help', '/reach-us'
+]
+
+# Contact path probing settings
+CONTACT_PROBE_CONCURRENCY = 6  # Contact paths probed at once for one site
+CONTACT_PROBE_TIMEOUT = (5, 8)  # Connect/read timeout for contact path probes
+CONTACT_STATS_FILE = "contact_path_stats.json"  # Hit counts per path across runs
+RECORD_HISTORY = True  # Save domain outcomes and contact path hits for later runs; never done offline
+MISSING_STATUSES = {404, 410}
+
+# Lean browser settings
+LEAN_BROWSER = True  # Block non-document resources and stop waiting at DOMContentLoaded
+PAGE_LOAD_STRATEGY = "eager"  # "eager" returns at DOMContentLoaded, "none" returns immediately
+CONTENT_SETTLE_TIMEOUT = 3  # Seconds to let script-rendered text appear after an eager load
+SITE_TIME_BUDGET = 90  # Seconds of page loads allowed per site
+SITE_BYTE_BUDGET = 5 * 1024 * 1024  # Bytes transferred allowed per site
+# Stylesheets, fonts, images and media
+BLOCKED_EXTENSIONS = [
+    "css", "woff", "woff2", "ttf", "otf", "eot",
+    "png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "bmp",
+    "mp4", "webm", "mov", "mp3", "wav", "ogg",
+]
+# Chrome matches each pattern against the whole URL, so assets served with a
+# query string (style.css?ver=6.4) need their own pattern
+BLOCKED_URL_PATTERNS = [pattern for ext in BLOCKED_EXTENSIONS for pattern in (f"*.{ext}", f"*.{ext}?*")] + [
+    # Analytics, ads, trackers and heavy embeds
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*adservice.google.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*",
+    "*analytics.tiktok.com*", "*bat.bing.com*", "*hs-analytics.net*", "*hs-scripts.com*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*use.typekit.net*",
+    "*maps.googleapis.com*", "*youtube.com/embed*", "*player.vimeo.com*",
+]
+
+# Patterns shared by the HTTP and browser tiers
+LINK_PATTERN = re.compile(r'<a\s[^>]*?href=["\']([^"\']+)["\'][^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+SCRIPT_STYLE_PATTERN = re.compile(r'<(script|style|noscript)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
 # Initialize Selenium WebDriver
-def initialize_driver():
+def initialize_driver(lean=LEAN_BROWSER):
     chrome_options = Options()
     # Comment this out if you want to see the browser
     chrome_options.add_argument("--headless")
@@ -27,23 +102,131 @@ def initialize_driver():
     # Disable JavaScript for faster loading (only if necessary)
     # chrome_options.add_argument("--disable-javascript")
     chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    if lean:
+        # Don't wait for every subresource before handing the page back
+        chrome_options.page_load_strategy = PAGE_LOAD_STRATEGY
+        for argument in ["--disable-extensions", "--disable-gpu", "--mute-audio",
+                         "--disable-background-networking", "--disable-default-apps"]:
+            chrome_options.add_argument(argument)
     
     # Initialize the Chrome driver
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
+    count_round_trips(driver)
     
     # Set a shorter page load timeout
     driver.set_page_load_timeout(20)  # Reduced from 30 to 20 seconds
+    # Bound how long a script may run, so a hung renderer is noticed
+    driver.set_script_timeout(RENDERER_TIMEOUT)
+    
+    if lean:
+        # Have Chrome drop stylesheets, fonts, media and trackers before they are requested
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            print(f"Could not enable resource blocking: {str(e)[:100]}")
     
     return driver
 
+# Driver binary, resolved once per process
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+# Function to find the chromedriver binary
+def chromedriver_path():
+    """Return the chromedriver path, asking ChromeDriverManager only the first time."""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
+# Function to count the WebDriver commands a driver sends
+def count_round_trips(driver):
+    """Wrap driver.execute so driver.round_trips counts every command.
+    
+    All WebDriver and WebElement commands go through execute, so this
+    sees page loads, scripts, element lookups and property reads alike.
+    """
+    execute = driver.execute
+    
+    def counting_execute(driver_command, params=None):
+        driver.round_trips += 1
+        return execute(driver_command, params)
+    
+    driver.round_trips = 0
+    driver.execute = counting_execute
+    return driver
+
+# Per-site limit on browser time and bytes transferred
+class SiteBudget:
+    """Track how much time and traffic one site's page loads have used."""
+    
+    def __init__(self, max_seconds=SITE_TIME_BUDGET, max_bytes=SITE_BYTE_BUDGET):
+        self.deadline = time.monotonic() + max_seconds
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.pages = 0
+    
+    def remaining_seconds(self):
+        return max(0, self.deadline - time.monotonic())
+    
+    def exhausted(self):
+        return self.remaining_seconds() <= 0 or self.bytes_used >= self.max_bytes
+    
+    def record_page(self, bytes_transferred):
+        """Add one loaded page and the bytes it transferred."""
+        self.pages += 1
+        self.bytes_used += bytes_transferred or 0
+
+# Function to give script-rendered content a moment after an eager load
+def wait_for_content(driver, timeout=CONTENT_SETTLE_TIMEOUT):
+    """Wait briefly until the body has some text; never raises."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            lambda d: (d.execute_script("return document.body ? document.body.innerText.length : 0") or 0) > MIN_VISIBLE_TEXT
+        )
+    except Exception:
+        pass
+
+# Function to read how long the server took to answer the last navigation
+def response_latency(driver):
+    """Return seconds from request to first response byte, or None if unknown."""
+    try:
+        ms = driver.execute_script(
+            "var nav = performance.getEntriesByType('navigation')[0];"
+            "return nav && nav.responseStart > 0 ? nav.responseStart - nav.requestStart : null;"
+        )
+        return ms / 1000 if ms is not None else None
+    except Exception:
+        return None
+
 # Safe way to navigate to a URL with timeout handling
-def safe_get(driver, url, timeout=20):
+def safe_get(driver, url, timeout=20, budget=None):
     """Navigate to URL with timeout handling."""
+    if budget is not None:
+        if budget.exhausted():
+            print(f"Skipping {url}: site budget used up ({budget.pages} pages, {budget.bytes_used // 1024} KB)")
+            return False
+        timeout = min(timeout, budget.remaining_seconds())
+    
+    # Wait for this site's turn; other sites aren't held up
+    scheduler = get_rate_limiter()
+    if scheduler:
+        with get_metrics().timer("rate_limit_wait"):
+            scheduler.acquire(url)
+    started = time.monotonic()
+    loaded = False
+    latency = None
     try:
         driver.get(url)
         WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
+        latency = response_latency(driver)
+        if driver.capabilities.get("pageLoadStrategy", "normal") != "normal":
+            wait_for_content(driver)
+        loaded = True
         return True
     except TimeoutException:
         print(f"Timeout when loading {url}")
@@ -54,57 +237,281 @@ def safe_get(driver, url, timeout=20):
     except Exception as e:
         print(f"Error loading {url}: {str(e)[:100]}")
         return False
+    finally:
+        elapsed = time.monotonic() - started
+        get_metrics().record_time("safe_get", elapsed, loaded=loaded)
+        if scheduler:
+            # Wall time includes rendering and the content wait, so the rate only
+            # adapts to the server's response time and to failed loads. The
+            # browser doesn't expose the status code, so a load counts as a 200
+            if not loaded:
+                scheduler.record(url, elapsed, None)
+            elif latency is not None:
+                scheduler.record(url, latency, 200)
 
-# Function to extract email from a webpage
-def extract_email_from_page(driver, url):
-    """Extract email from the current page."""
+# What one site's extraction looked at and found
+class SiteVisit:
+    """Collect the pages read and candidate addresses for one site.
+    
+    site is the row's Website as listed, which the domain health store is
+    keyed by even when pre-flight found the site has moved.
+    """
+    
+    def __init__(self, site=None):
+        self.site = site
+        self.candidates = []
+        self.pages = []
+        self.hit_page = None
+    
+    def record_page(self, url, candidates):
+        self.pages.append(url)
+        self.candidates.extend(candidates)
+        if candidates and self.hit_page is None:
+            self.hit_page = urlparse(url).path or "/"
+    
+    def all_emails(self):
+        return format_candidates(merge_candidates(self.candidates))
+    
+    def source_of(self, email):
+        """Return how the given address was written on the page (mailto, plain, ...)."""
+        return next((c.source for c in self.candidates if c.email == email), None)
+    
+    def hit_kind(self):
+        """Return which kind of page the email came from."""
+        if self.hit_page is None:
+            return None
+        if self.hit_page == "/":
+            return "main_page"
+        return "contact_path" if self.hit_page in CONTACT_PATHS else "contact_link"
+
+# Function to add one finished site to the run metrics
+def record_site_metrics(visit, email, tier):
+    metrics = get_metrics()
+    metrics.observe("pages_per_site", len(visit.pages), tier=tier)
+    source = visit.source_of(email)
+    if source:
+        metrics.count(f"hit_source.{source}")
+        metrics.count(f"hit_page.{visit.hit_kind()}")
+    else:
+        metrics.count("no_email")
+
+# Function to find an email address in raw HTML
+def find_email_in_html(html, site_url=None, visit=None):
+    """Return the best-ranked email address in an HTML string, or None.
+    
+    The page and its candidate addresses are added to visit when given.
+    """
+    with get_metrics().timer("email_regex"):
+        candidates = extract_emails(html, site_url)
+    if visit is not None:
+        visit.record_page(site_url, candidates)
+    return candidates[0].email if candidates else None
+
+# Everything extraction needs from one rendered page
+PageSnapshot = namedtuple("PageSnapshot", ["url", "html", "links", "mailtos", "bytes_transferred"])
+
+# One script returns the DOM, every link and the page's transfer size together
+SNAPSHOT_SCRIPT = """
+const links = Array.from(document.querySelectorAll('a[href]'), a => [a.href, (a.textContent || '').trim()]);
+return {
+    url: location.href,
+    html: document.documentElement.outerHTML,
+    links: links,
+    mailtos: links.filter(link => link[0].startsWith('mailto:')).map(link => link[0]),
+    bytes: performance.getEntries().reduce((total, entry) => total + (entry.transferSize || 0), 0)
+};
+"""
+
+# Function to capture the current page in a single round-trip
+@timed("dom_snapshot")
+def take_snapshot(driver, budget=None):
+    """Return a PageSnapshot of the loaded page, or None if the script fails."""
     try:
-        # Get all text from page
-        page_source = driver.page_source
-        
-        # Look for email patterns in the page source
-        email_pattern = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
-        email_matches = email_pattern.findall(page_source)
-        
-        if email_matches:
-            # Filter out common false positives
-            filtered_emails = [email for email in email_matches 
-                            if not any(domain in email.lower() for domain in [
-                                'example.com', 'yourdomain.com', 'domain.com', 
-                                'email@', 'user@', 'name@', 'someone@'
-                            ])]
-            if filtered_emails:
-                return filtered_emails[0]
-        
-        return None
+        data = driver.execute_script(SNAPSHOT_SCRIPT)
     except Exception as e:
-        print(f"Error extracting email from page: {e}")
+        print(f"Error capturing page: {str(e)[:100]}")
+        return None
+    snapshot = PageSnapshot(data.get("url") or "", data.get("html") or "", data.get("links") or [],
+                            data.get("mailtos") or [], data.get("bytes") or 0)
+    if budget is not None:
+        budget.record_page(snapshot.bytes_transferred)
+    return snapshot
+
+# Function to extract email from a page snapshot
+def extract_email_from_snapshot(snapshot, visit=None):
+    """Extract email from a snapshot; mailto targets set by scripts are included."""
+    return find_email_in_html(snapshot.html + "\n" + "\n".join(snapshot.mailtos), snapshot.url, visit)
+
+# Function to pick contact links out of a snapshot
+def contact_links_from_snapshot(snapshot, limit=2):
+    """Return up to limit links whose URL or text mentions "contact"."""
+    links = []
+    for href, text in snapshot.links:
+        if not href.startswith("http"):
+            continue
+        if 'contact' in href.lower() or 'contact' in text.lower():
+            if href not in links:
+                links.append(href)
+        if len(links) >= limit:
+            break
+    return links
+
+# Function to extract email from a webpage
+def extract_email_from_page(driver, url, visit=None, budget=None):
+    """Extract email from the current page."""
+    snapshot = take_snapshot(driver, budget)
+    if snapshot is None:
         return None
+    return extract_email_from_snapshot(snapshot, visit)
+
+# Hit counts for each contact path, shared by all workers
+_contact_stats = None
+_contact_stats_lock = threading.Lock()
+# Whether this run saves what it learned; offline replays only read history
+_record_history = RECORD_HISTORY
+
+# Function to load contact path hit counts from past runs
+def load_contact_path_stats():
+    """Return {path: hits}, reading the stats file on first use."""
+    global _contact_stats
+    with _contact_stats_lock:
+        if _contact_stats is None:
+            try:
+                with open(CONTACT_STATS_FILE) as f:
+                    _contact_stats = json.load(f)
+            except (OSError, ValueError):
+                _contact_stats = {}
+        return dict(_contact_stats)
+
+# Function to record that a contact path produced an email
+def record_contact_path_hit(path):
+    """Bump a path's hit count and persist the stats file."""
+    if not _record_history:
+        return
+    load_contact_path_stats()
+    with _contact_stats_lock:
+        _contact_stats[path] = _contact_stats.get(path, 0) + 1
+        try:
+            tmp_path = CONTACT_STATS_FILE + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(_contact_stats, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, CONTACT_STATS_FILE)
+        except OSError as e:
+            print(f"Could not save contact path stats: {e}")
+
+# Function to look up the contact path that worked for a site last time
+def preferred_contact_path(url, visit=None):
+    return get_domain_health().hit_page(visit.site if visit is not None and visit.site else url)
+
+# Function to remember how extraction went for a site
+def record_domain_outcome(url, result, pages_tried=0, hit_page=None):
+    """Store a site's outcome in the domain health store, unless this run only reads history."""
+    if _record_history:
+        get_domain_health().record(url, result, pages_tried, hit_page)
+
+# Function to order contact paths by past success
+def ranked_contact_paths(preferred=None):
+    """Return CONTACT_PATHS with the most productive paths first.
+    
+    preferred (the page that had this site's email last time) goes first.
+    """
+    stats = load_contact_path_stats()
+    # sorted() is stable, so paths without hits keep their default order
+    paths = sorted(CONTACT_PATHS, key=lambda path: -stats.get(path, 0))
+    if preferred and preferred != "/":
+        paths = [preferred] + [path for path in paths if path != preferred]
+    return paths
+
+# Function to check one contact path over HTTP
+async def probe_contact_path(fetcher, url):
+    """Probe a contact URL.
+
+    Returns (status, candidates). A cheap HEAD request comes first so
+    missing pages are dropped without downloading them; status is None
+    when the host couldn't be reached.
+    """
+    try:
+        response = await fetcher.get(url, method="HEAD", timeout=CONTACT_PROBE_TIMEOUT,
+                                     retries=0, allow_redirects=True)
+        if response.status_code in MISSING_STATUSES:
+            return response.status_code, []
+        # Some servers reject HEAD; the GET below settles it either way
+        response = await fetcher.get(url, timeout=CONTACT_PROBE_TIMEOUT, retries=0)
+    except Exception:
+        return None, []
+    if response.status_code != 200:
+        return response.status_code, []
+    return 200, extract_emails(response.text or "", url)
+
+# Function to probe all contact paths of a site at once
+async def probe_contact_paths(fetcher, base_domain, preferred=None):
+    """Probe every contact path concurrently, stopping at the first email.
+
+    Returns (candidates, hit_path, renderable_paths). renderable_paths are the
+    paths that weren't missing, in rank order, for the browser to render
+    when the static HTML had no email.
+    """
+    paths = ranked_contact_paths(preferred)
+    tasks = {asyncio.create_task(probe_contact_path(fetcher, f"{base_domain}{path}")): path
+             for path in paths}
+    statuses = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                path = tasks[task]
+                status, candidates = task.result()
+                statuses[path] = status
+                if candidates:
+                    return candidates, path, []
+    finally:
+        # Cancel outstanding probes as soon as one path has an email
+        for task in pending:
+            task.cancel()
+    
+    renderable = [path for path in paths if statuses.get(path) not in MISSING_STATUSES]
+    return [], None, renderable
+
+# Function to run the contact path probes from synchronous code
+def probe_contact_paths_sync(base_domain, preferred=None):
+    """Run probe_contact_paths with its own event loop and fetcher."""
+    async def run():
+        fetcher = AsyncFetcher(CONTACT_PROBE_CONCURRENCY, CONTACT_PROBE_CONCURRENCY)
+        try:
+            return await probe_contact_paths(fetcher, base_domain, preferred)
+        finally:
+            fetcher.close()
+    return asyncio.run(run())
 
 # Function to check common contact pages
-def check_contact_pages(driver, base_url):
+def check_contact_pages(driver, base_url, visit=None, budget=None):
     """Check common contact page paths for emails."""
-    # Common paths where contact information might be found
-    contact_paths = [
-        '/contact', '/contact-us', '/about/contact', '/about-us/contact',
-        '/contactus', '/about', '/about-us', '/connect', '/get-in-touch',
-        '/support', '/help', '/reach-us'
-    ]
-    
     try:
         # Get domain from base_url
         parsed_url = urlparse(base_url)
         base_domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
         
-        # Already checked the main page, start with contact pages
-        for path in contact_paths:
+        # Probe all paths over HTTP first; 404s never reach the browser
+        preferred = preferred_contact_path(base_url, visit)
+        candidates, hit_path, renderable = probe_contact_paths_sync(base_domain, preferred)
+        if candidates:
+            print(f"Found email on {base_domain}{hit_path} without rendering")
+            record_contact_path_hit(hit_path)
+            if visit is not None:
+                visit.record_page(f"{base_domain}{hit_path}", candidates)
+            return candidates[0].email
+        
+        # Render only the paths that exist, most productive first
+        for path in renderable:
             contact_url = f"{base_domain}{path}"
             try:
                 print(f"Checking contact page: {contact_url}")
-                if safe_get(driver, contact_url, timeout=15):
+                if safe_get(driver, contact_url, timeout=15, budget=budget):
                     # Extract email from this contact page
-                    email = extract_email_from_page(driver, contact_url)
+                    email = extract_email_from_page(driver, contact_url, visit, budget)
                     if email:
+                        record_contact_path_hit(path)
                         return email
                 else:
                     print(f"Skipping {contact_url} due to loading issues")
@@ -118,30 +525,13 @@ def check_contact_pages(driver, base_url):
         print(f"Error in check_contact_pages: {e}")
         return None
 
-# Function to look for "mailto:" links
-def find_mailto_links(driver):
-    """Find mailto links in the page."""
-    try:
-        # Look for mailto links
-        mailto_links = driver.find_elements(By.XPATH, "//a[starts-with(@href, 'mailto:')]")
-        
-        if mailto_links:
-            for link in mailto_links:
-                href = link.get_attribute('href')
-                if href:
-                    # Extract email from mailto link
-                    email_match = re.search(r'mailto:([\w.+-]+@[\w-]+\.[\w.-]+)', href)
-                    if email_match:
-                        return email_match.group(1)
-        
-        return None
-    except Exception as e:
-        print(f"Error finding mailto links: {e}")
-        return None
-
 # Function to extract email from company website
-def extract_company_email(driver, website_url):
-    """Extract email from company website by checking multiple pages."""
+@timed("extract_company_email")
+def extract_company_email(driver, website_url, visit=None):
+    """Extract email from company website by checking multiple pages.
+    
+    Pages read and candidate addresses seen are added to visit when given.
+    """
     if not website_url or not isinstance(website_url, str):
         return "No website URL provided"
     
@@ -150,62 +540,47 @@ def extract_company_email(driver, website_url):
     if not website_url.startswith('http'):
         website_url = 'http://' + website_url
     
+    # Cap the time and traffic this one site can use
+    budget = SiteBudget()
+    
     try:
         # First, try the main page
         print(f"Checking main website: {website_url}")
-        if not safe_get(driver, website_url, timeout=20):
+        if not safe_get(driver, website_url, timeout=20, budget=budget):
             # Try with www. if the original URL doesn't have it
             if 'www.' not in website_url:
                 parsed = urlparse(website_url)
                 www_url = f"{parsed.scheme}://www.{parsed.netloc}{parsed.path}"
                 print(f"Trying with www prefix: {www_url}")
-                if not safe_get(driver, www_url, timeout=15):
+                if not safe_get(driver, www_url, timeout=15, budget=budget):
                     return "Website timeout or error"
         
-        # Look for mailto links first (these are most reliable)
-        email = find_mailto_links(driver)
-        if email:
-            return email
+        # Capture the main page once; everything below works on this copy
+        main_page = take_snapshot(driver, budget)
+        if main_page is None:
+            return "Website timeout or error"
         
-        # Extract email from main page
-        email = extract_email_from_page(driver, website_url)
+        # Extract email from main page; mailto links rank highest
+        email = extract_email_from_snapshot(main_page, visit)
         if email:
             return email
         
         # If no email found on main page, check common contact pages
-        email = check_contact_pages(driver, website_url)
+        email = check_contact_pages(driver, website_url, visit, budget)
         if email:
             return email
         
-        # If we still haven't found an email, try to find and click a "Contact" link
-        try:
-            # Find links that might lead to contact pages
-            contact_links = driver.find_elements(
-                By.XPATH, 
-                "//a[contains(translate(text(), 'CONTACT', 'contact'), 'contact') or contains(@href, 'contact')]"
-            )
-            
-            if contact_links:
-                # Try the first few contact links
-                for link in contact_links[:2]:  # Reduced from 3 to 2 to speed up
-                    try:
-                        contact_url = link.get_attribute('href')
-                        if contact_url:
-                            if safe_get(driver, contact_url, timeout=15):
-                                # Look for mailto links first
-                                email = find_mailto_links(driver)
-                                if email:
-                                    return email
-                                    
-                                # Extract email from contact page
-                                email = extract_email_from_page(driver, contact_url)
-                                if email:
-                                    return email
-                    except Exception as e:
-                        print(f"Error following contact link: {e}")
-                        continue
-        except Exception as e:
-            print(f"Error finding contact links: {e}")
+        # If we still haven't found an email, follow the main page's "Contact" links
+        for contact_url in contact_links_from_snapshot(main_page):
+            try:
+                if safe_get(driver, contact_url, timeout=15, budget=budget):
+                    # Extract email from contact page
+                    email = extract_email_from_page(driver, contact_url, visit, budget)
+                    if email:
+                        return email
+            except Exception as e:
+                print(f"Error following contact link: {e}")
+                continue
         
         return "No email found on website"
         
@@ -214,7 +589,158 @@ def extract_company_email(driver, website_url):
     except Exception as e:
         return f"Error: {str(e)[:100]}"  # Truncate long error messages
 
+# Function to decide whether a static response is good enough to parse
+def static_escalation_reason(response):
+    """Return why a page needs a real browser, or None if the HTML is usable."""
+    if response.status_code in BLOCKED_STATUSES:
+        return f"blocked ({response.status_code})"
+    html = response.text or ""
+    if not html.strip():
+        return "empty response"
+    lowered = html.lower()
+    if any(marker in lowered for marker in JS_GATE_MARKERS):
+        return "JS challenge"
+    # Strip scripts and tags; a near-empty body usually means a JS-rendered site
+    visible_text = TAG_PATTERN.sub(" ", SCRIPT_STYLE_PATTERN.sub(" ", html))
+    if len(" ".join(visible_text.split())) < MIN_VISIBLE_TEXT:
+        return "JS-rendered"
+    return None
+
+# Function to find contact links in raw HTML
+def find_contact_links_in_html(html, page_url, limit=2):
+    """Return absolute URLs of links that look like contact pages."""
+    links = []
+    for href, text in LINK_PATTERN.findall(html):
+        href = href.strip()
+        if href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+        if 'contact' in href.lower() or 'contact' in TAG_PATTERN.sub('', text).lower():
+            url = urllib.parse.urljoin(page_url, href)
+            if url not in links:
+                links.append(url)
+        if len(links) >= limit:
+            break
+    return links
+
+# Function to fetch a page in the HTTP tier
+@timed("http_fetch")
+async def fetch_static(fetcher, url, errors=None):
+    """Fetch a page with a short timeout; returns None on network errors.
+    
+    The exception is appended to errors when a list is given.
+    """
+    try:
+        return await fetcher.get(url, timeout=STATIC_TIMEOUT, retries=1)
+    except Exception as e:
+        print(f"HTTP tier could not fetch {url}: {str(e)[:100]}")
+        if errors is not None:
+            errors.append(e)
+        return None
+
+# Function to extract email from company website without a browser
+@timed("extract_company_email_static")
+async def extract_company_email_static(fetcher, website_url, visit=None):
+    """Try to find the email with plain HTTP requests.
+
+    Returns (result, escalation_reason). When escalation_reason is set the
+    static HTML wasn't usable and the site should go to the browser tier.
+    Pages read and candidate addresses seen are added to visit when given.
+    """
+    if not website_url or not isinstance(website_url, str):
+        return "No website URL provided", None
+    
+    # Clean up URL
+    website_url = website_url.strip()
+    if not website_url.startswith('http'):
+        website_url = 'http://' + website_url
+    
+    # First, try the main page
+    errors = []
+    response = await fetch_static(fetcher, website_url, errors)
+    if response is None and 'www.' not in website_url:
+        # Try with www. if the original URL doesn't have it
+        parsed = urlparse(website_url)
+        response = await fetch_static(fetcher, f"{parsed.scheme}://www.{parsed.netloc}{parsed.path}", errors)
+    if response is None:
+        # A browser can't load a domain that doesn't resolve either
+        if errors and all(is_dns_error(e) for e in errors):
+            return "Website DNS lookup failed", None
+        return None, "unreachable over HTTP"
+    
+    # A missing or broken homepage won't look any better in a browser
+    if response.status_code in MISSING_STATUSES or (response.status_code >= 500 and response.status_code not in BLOCKED_STATUSES):
+        return f"Website returned {response.status_code}", None
+    
+    reason = static_escalation_reason(response)
+    if reason:
+        return None, reason
+    
+    html = response.text
+    page_url = response.url
+    
+    # Look for the email on the main page; mailto links rank highest
+    email = find_email_in_html(html, page_url, visit)
+    if email:
+        return email, None
+    
+    # Then the common contact paths, all probed at once
+    parsed_url = urlparse(page_url)
+    base_domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
+    preferred = preferred_contact_path(website_url, visit)
+    candidates, hit_path, _ = await probe_contact_paths(fetcher, base_domain, preferred)
+    if candidates:
+        record_contact_path_hit(hit_path)
+        if visit is not None:
+            visit.record_page(f"{base_domain}{hit_path}", candidates)
+        return candidates[0].email, None
+    
+    # Finally any contact links on the main page
+    probed = {f"{base_domain}{path}" for path in CONTACT_PATHS}
+    for contact_url in find_contact_links_in_html(html, page_url):
+        if contact_url in probed:
+            continue
+        response = await fetch_static(fetcher, contact_url)
+        if response is None or response.status_code != 200:
+            continue
+        email = find_email_in_html(response.text, contact_url, visit)
+        if email:
+            return email, None
+    
+    return "No email found on website", None
+
+# Function to run the HTTP tier over many sites at once
+async def run_static_tier(items, on_result):
+    """Run the HTTP tier concurrently; returns the items that need a browser."""
+    fetcher = AsyncFetcher(STATIC_CONCURRENCY, STATIC_PER_HOST)
+    
+    async def process(item):
+        position, index, name, website, site = item
+        visit = SiteVisit(site)
+        try:
+            return item, await extract_company_email_static(fetcher, website, visit), visit
+        except Exception as e:
+            return item, (None, f"error: {str(e)[:50]}"), visit
+    
+    escalated = []
+    try:
+        for next_done in asyncio.as_completed([process(item) for item in items]):
+            item, (email, reason), visit = await next_done
+            if reason:
+                print(f"[http] {item[2]}: needs browser ({reason})")
+                escalated.append(item)
+            else:
+                print(f"[http] {item[2]}: {email}")
+                record_domain_outcome(item[4], email, len(visit.pages), visit.hit_page)
+                record_site_metrics(visit, email, "http")
+                on_result(item[0], item[1], email, "http", visit.all_emails())
+    finally:
+        fetcher.close()
+    
+    escalated.sort()
+    return escalated
+
 # Function to restart the browser
+@timed("restart_browser")
 def restart_browser(driver):
     """Restart the browser if it's having issues."""
     try:
@@ -226,14 +752,264 @@ def restart_browser(driver):
     print("Restarting browser...")
     return initialize_driver()
 
-# Main function to update the existing Email column in the CSV
-def update_emails_from_websites(csv_path, output_path=None, start_from=0):
-    driver = None
+# Function to check that a driver still responds
+def is_driver_alive(driver):
+    """Return True if the browser still answers WebDriver commands."""
+    try:
+        driver.title
+        return True
+    except Exception:
+        return False
+
+# Function to check that the page's renderer still runs scripts
+def is_renderer_responsive(driver):
+    """Return False if a trivial script doesn't finish within the script timeout."""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+# Function to measure how much memory a browser uses
+def browser_memory_mb(driver):
+    """Return the RSS of chromedriver, Chrome and its helpers in MB, or None."""
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    rss = process_tree_rss(pid)
+    return rss / (1024 * 1024) if rss is not None else None
+
+# Function to leave the browser clean for the next site without relaunching it
+def reset_browser_state(driver, visited_urls=()):
+    """Close extra tabs, clear cookies, cache and storage, and park on about:blank.
+    
+    Storage is per origin, so it is cleared for every origin in visited_urls
+    and every open tab, not just the page currently loaded.
+    """
+    urls = list(visited_urls)
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        urls.append(driver.current_url)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    urls.append(driver.current_url)
+    
+    origins = set()
+    for url in urls:
+        parsed = urlparse(url or "")
+        if parsed.scheme in ("http", "https") and parsed.netloc:
+            origins.add(f"{parsed.scheme}://{parsed.netloc}")
     try:
-        # Initialize WebDriver
-        driver = initialize_driver()
-        print("Browser initialized successfully")
+        for origin in origins:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    except Exception:
+        # Without DevTools, at least clear the storage of the page that's loaded
+        try:
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        except Exception:
+            pass  # Pages that never finished loading can refuse scripts
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except Exception:
+        driver.delete_all_cookies()
+    driver.get("about:blank")
+
+# Worker thread that owns one browser and pulls rows from a shared queue
+class BrowserWorker(threading.Thread):
+    """Process websites from a task queue with a dedicated headless browser."""
+    
+    def __init__(self, worker_id, tasks, results, stop_event):
+        super().__init__(name=f"browser-worker-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.tasks = tasks
+        self.results = results
+        self.stop_event = stop_event
+        self.driver = None
+        self.consecutive_errors = 0
+        self.sites_since_restart = 0
+        self.restart_count = 0
+        self.peak_memory_mb = 0
+    
+    def log(self, message):
+        print(f"[worker {self.worker_id}] {message}")
+    
+    def restart(self, reason):
+        self.log(f"{reason}. Restarting browser...")
+        get_metrics().count("browser_restarts")
+        self.driver = restart_browser(self.driver)
+        self.consecutive_errors = 0
+        self.sites_since_restart = 0
+        self.restart_count += 1
+    
+    def restart_reason(self, visited_urls=()):
+        """Reset the browser after a site; return why it must be relaunched, or None."""
+        if self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+            return f"Too many consecutive errors ({self.consecutive_errors})"
+        if not is_driver_alive(self.driver):
+            return "Browser stopped responding"
+        if not is_renderer_responsive(self.driver):
+            return "Renderer hung"
+        try:
+            reset_browser_state(self.driver, visited_urls)
+        except Exception as e:
+            return f"Could not reset browser state ({str(e)[:50]})"
+        
+        memory_mb = browser_memory_mb(self.driver)
+        if memory_mb is None:
+            # Without a measurement, fall back to restarting every so often
+            if self.sites_since_restart >= ROUTINE_RESTART_EVERY:
+                return "Routine browser restart (memory use unknown)"
+            return None
+        self.peak_memory_mb = max(self.peak_memory_mb, memory_mb)
+        get_metrics().observe("browser_rss_mb", round(memory_mb, 1), worker=self.worker_id)
+        if memory_mb > BROWSER_MEMORY_LIMIT_MB:
+            return f"Browser uses {memory_mb:.0f} MB (limit {BROWSER_MEMORY_LIMIT_MB} MB)"
+        return None
+    
+    def run(self):
+        try:
+            self.driver = initialize_driver()
+            self.log("Browser initialized successfully")
+        except Exception as e:
+            self.log(f"Could not start browser: {e}")
+            return
         
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    position, index, name, website, site = self.tasks.get_nowait()
+                except queue.Empty:
+                    break
+                
+                self.log(f"Processing {position}: {name} ({website})")
+                visit = SiteVisit(site)
+                round_trips_before = getattr(self.driver, "round_trips", 0)
+                try:
+                    # Extract email from company website
+                    email = extract_company_email(self.driver, website, visit)
+                    # Reset error counter on success
+                    self.consecutive_errors = 0
+                except Exception as e:
+                    self.log(f"Error processing {website}: {e}")
+                    email = f"Error processing: {str(e)[:50]}"
+                    self.consecutive_errors += 1
+                
+                round_trips = getattr(self.driver, "round_trips", 0) - round_trips_before
+                self.log(f"{name}: {email} ({round_trips} driver round-trips)")
+                # Crashes are about our browser, not the site, so they aren't remembered
+                if not email.startswith("Error processing"):
+                    record_domain_outcome(site, email, len(visit.pages), visit.hit_page)
+                record_site_metrics(visit, email, "browser")
+                self.results.put((position, index, email, "browser", visit.all_emails(), round_trips))
+                self.sites_since_restart += 1
+                
+                # Clean up for the next site; relaunch only when measurements say so
+                reason = self.restart_reason([website, site] + visit.pages)
+                if reason:
+                    self.restart(reason)
+        finally:
+            # Always close the driver
+            if self.driver:
+                try:
+                    self.driver.quit()
+                    self.log("Browser closed")
+                except:
+                    pass
+
+# Function to pick the stable key that identifies a row across runs
+def row_key(row):
+    """Return the row's Detail_URL, falling back to its normalised website."""
+    detail_url = row.get('Detail_URL')
+    if isinstance(detail_url, str) and detail_url.strip():
+        return detail_url.strip()
+    website = row.get('Website')
+    if isinstance(website, str) and website.strip():
+        return website.strip().lower().rstrip('/')
+    return None
+
+# Append-only log of finished rows, so a crash never loses completed work
+class ResultsJournal:
+    """Record each row's outcome as one JSON line, synced to disk."""
+    
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+    
+    @staticmethod
+    def load(path):
+        """Return {key: record} for every row already in the journal."""
+        done = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A crash mid-write can leave a partial last line
+                        continue
+                    done[record["key"]] = record
+        except FileNotFoundError:
+            pass
+        return done
+    
+    @timed("journal_write")
+    def record(self, key, **fields):
+        self.file.write(json.dumps({"key": key, **fields, "time": time.time()}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    
+    def close(self):
+        self.file.close()
+
+# Function to tell whether a journal entry still applies to a row
+def journal_entry_current(entry, fingerprint=None):
+    """Return True if the entry was recorded for this version of the listing.
+    
+    Rows from an incremental crawl carry a listing fingerprint; when the
+    listing changes, its old result no longer counts. Entries recorded
+    before fingerprints existed are kept.
+    """
+    if entry is None:
+        return False
+    return not fingerprint or entry.get("Fingerprint") in (None, fingerprint)
+
+# Function to read a row's listing fingerprint, if the CSV has one
+def row_fingerprint(row):
+    fingerprint = row.get('Fingerprint')
+    return fingerprint if isinstance(fingerprint, str) and fingerprint else None
+
+# Function to tell whether a journaled failure is due for another try
+def failure_expired(entry, website):
+    """Return True if the entry is a failure the domain health store no longer vouches for.
+    
+    Failures are journaled like any result, so without this a resumed run
+    would never retry them; they get another attempt once the outcome's TTL
+    in the domain health store runs out.
+    """
+    if classify_result(entry.get("Email")) == "found":
+        return False
+    health = get_domain_health()
+    record = health.get(website)
+    return record is None or not health.is_fresh(record)
+
+# Main function to update the existing Email column in the CSV
+def update_emails_from_websites(csv_path, output_path=None, workers=NUM_WORKERS, http_first=HTTP_FIRST, offline=False, resume=True,
+                                skip_known_failures=True, preflight=True):
+    global _record_history
+    # Cached replays say nothing new about the sites, so they leave the history alone
+    _record_history = RECORD_HISTORY and not offline
+    # Replay website fetches from the local cache; browsers can't be replayed
+    if offline:
+        configure_cache(offline=True)
+        http_first = True
+        print("Offline mode: only cached pages are checked, no browser is started")
+    
+    pool = []
+    journal = None
+    stop_event = threading.Event()
+    try:
         # Load the existing CSV
         df = pd.read_csv(csv_path)
         print(f"Loaded CSV with {len(df)} entries")
@@ -241,6 +1017,15 @@ def update_emails_from_websites(csv_path, output_path=None, start_from=0):
         # Set output path
         if not output_path:
             output_path = csv_path.replace('.csv', '_updated_emails.csv')
+        journal_path = os.path.splitext(output_path)[0] + '_journal.jsonl'
+        metrics = configure_metrics(os.path.splitext(output_path)[0] + '_metrics.jsonl')
+        
+        # Results from earlier runs; start a fresh journal when not resuming
+        if not resume and os.path.exists(journal_path):
+            os.remove(journal_path)
+        done = ResultsJournal.load(journal_path)
+        if done:
+            print(f"Resuming: {len(done)} rows already done in {journal_path}")
         
         # Process each row that has a website URL
         # Get rows with websites
@@ -248,93 +1033,187 @@ def update_emails_from_websites(csv_path, output_path=None, start_from=0):
         total_to_process = len(to_process)
         
         print(f"Need to process {total_to_process} entries with website URLs")
-        print(f"Starting from index {start_from}")
         
         if total_to_process == 0:
             print("No entries to process. Make sure 'Website' column exists.")
             return
         
-        browser_restart_count = 0
-        consecutive_errors = 0
+        # Record which tier produced each result
+        if 'Email_Tier' not in df.columns:
+            df['Email_Tier'] = None
+        tier_counts = {"cache": 0, "preflight": 0, "http": 0, "browser": 0}
+        driver_round_trips = []
+        received = 0
         
-        # Skip to the starting point
-        processed = 0
-        for index, row in to_process.iloc[start_from:].iterrows():
+        row_keys = {}
+        row_fingerprints = {}
+        items = []
+        removed = 0
+        for position, (index, row) in enumerate(to_process.iterrows(), start=1):
             website = row['Website']
-            if isinstance(website, str) and website.strip():
-                print(f"\nProcessing {start_from + processed + 1} of {total_to_process}: {row['Name']}")
-                print(f"Website URL: {website}")
-                
-                try:
-                    # Extract email from company website
-                    email = extract_company_email(driver, website)
-                    
-                    # Update the Email column directly
-                    df.at[index, 'Email'] = email
-                    
-                    # Reset error counter on success
-                    consecutive_errors = 0
-                    
-                except Exception as e:
-                    print(f"Error processing {website}: {e}")
-                    df.at[index, 'Email'] = f"Error processing: {str(e)[:50]}"
-                    consecutive_errors += 1
-                
-                # Restart browser if too many consecutive errors
-                if consecutive_errors >= 3:
-                    print(f"Too many consecutive errors ({consecutive_errors}). Restarting browser...")
-                    driver = restart_browser(driver)
-                    consecutive_errors = 0
-                    browser_restart_count += 1
-                
-                # Restart browser every 20 websites to prevent memory issues
-                if (processed + 1) % 20 == 0:
-                    print("Routine browser restart to prevent memory issues")
-                    driver = restart_browser(driver)
-                    browser_restart_count += 1
-                
-                # Save progress every 3 entries
-                processed += 1
-                if processed % 3 == 0 or processed + start_from == total_to_process:
-                    current_progress = start_from + processed
-                    print(f"Progress: {current_progress}/{total_to_process} ({current_progress/total_to_process*100:.1f}%)")
-                    df.to_csv(output_path, index=False)
-                    print(f"Progress saved to {output_path}")
-                
-                # Add a delay between websites
-                time.sleep(2)  # Reduced from 3 to 2 seconds
+            key = row_key(row)
+            # Listings an incremental crawl found gone aren't worth a visit
+            if row.get('Listing_Status') == 'removed':
+                removed += 1
+                continue
+            if not (isinstance(website, str) and website.strip()):
+                continue
+            # Unchanged listings keep their result, failures until they expire; changed ones are redone
+            entry = done.get(key)
+            if journal_entry_current(entry, row_fingerprint(row)) and not failure_expired(entry, website):
+                continue
+            row_keys[index] = key
+            row_fingerprints[index] = row_fingerprint(row)
+            # The URL to visit, and the listed Website that outcomes are recorded under
+            items.append((position, index, row['Name'], website, website))
+        if removed:
+            print(f"Skipping {removed} listings that were removed from the directory")
+        queued = len(items)
+        print(f"{queued} rows left to process")
         
-        # Final save
-        df.to_csv(output_path, index=False)
-        print(f"✅ All done! Data saved to {output_path}")
-        print(f"Browser was restarted {browser_restart_count} times")
+        journal = ResultsJournal(journal_path)
+        
+        # Single writer: only this thread writes the journal
+        def record_result(position, index, email, tier, all_emails="", round_trips=0):
+            nonlocal received
+            journal.record(row_keys[index], Email=email, Email_Tier=tier, All_Emails=all_emails,
+                           Driver_Round_Trips=round_trips, Fingerprint=row_fingerprints[index])
+            if tier == "browser":
+                driver_round_trips.append(round_trips)
+            done[row_keys[index]] = {"Email": email, "Email_Tier": tier, "All_Emails": all_emails,
+                                     "Fingerprint": row_fingerprints[index]}
+            tier_counts[tier] += 1
+            metrics.count("rows")
+            metrics.count(f"tier.{tier}")
+            received += 1
+            
+            if received % PROGRESS_EVERY == 0 or received == queued:
+                print(f"Progress: {received}/{queued} ({received/queued*100:.1f}%), "
+                      f"{metrics.rate_per_minute('rows'):.1f} rows/min")
+        
+        # Domains that recently had no email or didn't load are skipped until
+        # their outcome expires in the domain health store
+        if skip_known_failures and items:
+            health = get_domain_health()
+            remaining = []
+            for item in items:
+                cached = health.cached_failure(item[4])
+                if cached:
+                    record_result(item[0], item[1], cached, "cache")
+                else:
+                    remaining.append(item)
+            if len(remaining) < len(items):
+                print(f"Skipped {len(items) - len(remaining)} sites with a recent failure on record")
+            items = remaining
+        
+        # One DNS lookup and HEAD request per distinct site; dead sites stop
+        # here and redirected ones continue with their final URL
+        if preflight and items and not offline:
+            print(f"Pre-flight check of {len(items)} sites")
+            with metrics.timer("preflight"):
+                triage = triage_websites([item[3] for item in items])
+            print(f"Pre-flight: {summarize(triage)}")
+            reachable = []
+            for position, index, name, website, site in items:
+                result = triage[website]
+                if result.status == "dead":
+                    record_domain_outcome(site, result.reason)
+                    record_result(position, index, result.reason, "preflight")
+                else:
+                    reachable.append((position, index, name, result.url, site))
+            items = reachable
+        
+        # Fast path: plain HTTP for every site, browser only where that fails
+        if http_first and items:
+            print(f"Checking {len(items)} sites over plain HTTP first")
+            items = asyncio.run(run_static_tier(items, record_result))
+            print(f"{len(items)} sites need a browser")
+        
+        if (offline or workers == 0) and items:
+            print(f"{'Offline mode' if offline else 'No browser workers'}: leaving {len(items)} sites that need a browser unchanged")
+            queued -= len(items)
+            items = []
+        
+        # Queue up the rows; workers take the next one as soon as they're free
+        tasks = queue.Queue()
+        results = queue.Queue()
+        for item in items:
+            tasks.put(item)
+        
+        if items:
+            workers = max(1, min(workers, len(items)))
+            print(f"Starting {workers} browser worker(s)")
+            pool = [BrowserWorker(worker_id, tasks, results, stop_event) for worker_id in range(1, workers + 1)]
+            for worker in pool:
+                worker.start()
+        
+        while received < queued:
+            try:
+                record_result(*results.get(timeout=1))
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in pool):
+                    print("All browser workers have stopped.")
+                    break
+        
+        for worker in pool:
+            worker.join()
+        
+        print(f"Emails resolved over HTTP: {tier_counts['http']}, with a browser: {tier_counts['browser']}, "
+              f"skipped from the domain health store: {tier_counts['cache']}, "
+              f"dead at pre-flight: {tier_counts['preflight']}")
+        if driver_round_trips:
+            print(f"Driver round-trips per browser site: {sum(driver_round_trips) / len(driver_round_trips):.1f} on average, "
+                  f"{max(driver_round_trips)} at most")
+        print(f"Browsers were restarted {sum(worker.restart_count for worker in pool)} times")
+        if any(worker.peak_memory_mb for worker in pool):
+            print(f"Peak browser memory: {max(worker.peak_memory_mb for worker in pool):.0f} MB")
         
     except Exception as e:
         print(f"Error in main function: {e}")
-        # Save progress even if there's an error
-        if 'df' in locals() and 'output_path' in locals():
-            df.to_csv(output_path, index=False)
-            print(f"Progress saved to {output_path} after error")
-        
-        # Print information for resuming
-        if 'processed' in locals() and 'start_from' in locals():
-            resume_from = start_from + processed
-            print(f"To resume, run script with start_from={resume_from}")
+        print("Finished rows are in the journal; run again to resume where this run stopped")
     finally:
-        # Always close the driver
-        if driver:
-            try:
-                driver.quit()
-                print("Browser closed")
-            except:
-                pass
+        # Tell workers to finish their current site and close their browsers
+        stop_event.set()
+        for worker in pool:
+            worker.join(timeout=60)
+        if journal:
+            journal.close()
+    
+    # Build the output CSV once, from everything recorded so far
+    if 'done' in locals():
+        # An all-empty column is read as float; the results are text
+        for column in ['Email', 'Email_Tier', 'All_Emails']:
+            df[column] = df[column].astype(object) if column in df.columns else None
+        for index, row in df.iterrows():
+            record = done.get(row_key(row))
+            if journal_entry_current(record, row_fingerprint(row)):
+                df.at[index, 'Email'] = record["Email"]
+                df.at[index, 'Email_Tier'] = record.get("Email_Tier")
+                df.at[index, 'All_Emails'] = record.get("All_Emails")
+        with get_metrics().timer("csv_write"):
+            df.to_csv(output_path, index=False)
+        print(f"✅ All done! Data saved to {output_path}")
+        get_metrics().report("Email extraction")
+        get_metrics().close()
 
 # Run the script
 if __name__ == "__main__":
     csv_file = "ycea_business_directory.csv"  # Update with your CSV file name
     
-    # If you need to resume from a specific point, uncomment and edit the line below
-    # update_emails_from_websites(csv_file, start_from=20)
+    # Runs resume automatically from the results journal; to start over instead
+    # update_emails_from_websites(csv_file, resume=False)
+    
+    # To run several browsers in parallel, pass the number of workers
+    # update_emails_from_websites(csv_file, workers=4)
+    
+    # To send every site to extraction without the DNS/HEAD pre-flight check
+    # update_emails_from_websites(csv_file, preflight=False)
+    
+    # To retry domains that recently failed instead of skipping them
+    # update_emails_from_websites(csv_file, skip_known_failures=False)
+    
+    # To re-run extraction on cached pages without any network access
+    # update_emails_from_websites(csv_file, offline=True)
     
     # Otherwise, start from the beginning
     update_emails_from_websites(csv_file)
\ No newline at end of file
@@ -0,0 +1,188 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import re
+import resource
+import sys
+import tempfile
+import time
+import traceback
+
+# End-to-end benchmark of scraper.main and update_emails_from_websites
+# against the local fixture server, so speed can be measured without
+# touching the real directory or company sites. Each scenario runs in a
+# fresh process and working directory (no warm caches, clean peak RSS).
+# Run from the repository root:
+#   python benchmarks/bench_end_to_end.py [--save results.json] [--compare baseline.json]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixture_server import FixtureServer  # noqa: E402
+
+SCENARIOS = ["scrape", "scrape_async", "directory_async", "emails"]
+TOLERANCE = 0.15  # Allowed slowdown or memory growth before --compare flags it
+POLL_SECONDS = 1  # How often the harness checks that a scenario's process is still alive
+
+# Function to run one scenario inside its own process
+def run_scenario(name, urls, workdir, options, results):
+    os.chdir(workdir)
+    sys.stdout = sys.stderr = open("run.log", "w", encoding="utf-8", buffering=1)
+    try:
+        results.put(measure_scenario(name, urls, options))
+    except BaseException:
+        traceback.print_exc()
+        results.put({"error": traceback.format_exc()})
+
+# Function to time one scenario and collect its results
+def measure_scenario(name, urls, options):
+    if not options["rate_limit"]:
+        import rate_limiter
+        rate_limiter.RATE_LIMITING = False
+
+    import scraper
+    import add_emails
+    from metrics import get_metrics
+
+    started = time.perf_counter()
+    if name == "scrape":
+        scraper.main(output_path="out.csv", base_url=urls["category"])
+    elif name == "scrape_async":
+        scraper.main(use_async=True, output_path="out.csv", base_url=urls["category"])
+    elif name == "directory_async":
+        scraper.main(use_async=True, full_directory=True, output_path="out.csv", index_url=urls["index"])
+    elif name == "emails":
+        add_emails.update_emails_from_websites("in.csv", output_path="out.csv", workers=options["workers"])
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is in kilobytes on Linux; children covers Chrome and chromedriver
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {
+        "elapsed": elapsed,
+        "rows": get_metrics().counters.get("rows", 0),
+        "peak_rss_mb": peak_kb / 1024,
+        "stages": {stage: s["p95"] for stage, s in get_metrics().summary()["stages"].items()},
+    }
+
+# Function to wait for a scenario's results without hanging on a dead process
+def wait_for_result(process, results):
+    """Return the scenario's result dict; it has an "error" key if the run failed."""
+    while True:
+        try:
+            return results.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            if not process.is_alive():
+                # It may have put its result just before exiting
+                try:
+                    return results.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    return {"error": f"process exited with code {process.exitcode} without a result"}
+
+# Function to write the input CSV for the email scenario
+def write_email_input(server, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Name", "Website", "Email", "Detail_URL"])
+        writer.writeheader()
+        for number in range(server.business_count):
+            writer.writerow({"Name": f"Business {number} LLC", "Website": server.website(number) or "",
+                             "Email": "", "Detail_URL": f"{server.directory_root}/list/member/business-{number}"})
+
+# Function to count how many expected addresses the email run found
+def email_accuracy(server, path):
+    found = expected = 0
+    with open(path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            number = int(re.search(r"business-(\d+)$", row["Detail_URL"]).group(1))
+            email = server.expected_email(number)
+            if email:
+                expected += 1
+                found += row.get("Email") == email
+    return found, expected
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scraper benchmark against a local fixture server")
+    parser.add_argument("scenarios", nargs="*", default=SCENARIOS, help=f"any of {', '.join(SCENARIOS)}")
+    parser.add_argument("--workers", type=int, default=0, help="browser workers for the email run (0: HTTP tier only)")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the per-domain rate limiter on")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every response")
+    parser.add_argument("--hang", type=float, default=12, help="seconds the hanging sites take to answer")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="flag regressions against a saved results file")
+    args = parser.parse_args()
+
+    options = {"workers": args.workers, "rate_limit": args.rate_limit}
+    context = multiprocessing.get_context("spawn")
+    report = {}
+    failures = {}
+    with FixtureServer(latency=args.latency, hang_seconds=args.hang) as server:
+        urls = {"category": server.category_url(0), "index": server.index_url}
+        print(f"Fixture directory at {server.index_url}: {server.business_count} businesses\n")
+        for name in args.scenarios:
+            workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+            if name == "emails":
+                write_email_input(server, os.path.join(workdir, "in.csv"))
+            results = context.Queue()
+            requests_before = server.requests_served
+            process = context.Process(target=run_scenario, args=(name, urls, workdir, options, results))
+            process.start()
+            result = wait_for_result(process, results)
+            process.join()
+            if "error" in result:
+                failures[name] = (result["error"], workdir)
+                continue
+            result["pages"] = server.requests_served - requests_before
+            result["pages_per_sec"] = result["pages"] / result["elapsed"]
+            result["rows_per_min"] = result["rows"] / result["elapsed"] * 60
+            if name == "emails":
+                result["emails_found"], result["emails_expected"] = email_accuracy(server, os.path.join(workdir, "out.csv"))
+            result["workdir"] = workdir
+            report[name] = result
+
+    print(f"{'scenario':<16} {'seconds':>8} {'pages':>6} {'pages/s':>8} {'rows':>5} {'rows/min':>9} {'peak MB':>8}")
+    for name, r in report.items():
+        print(f"{name:<16} {r['elapsed']:>8.2f} {r['pages']:>6} {r['pages_per_sec']:>8.1f} {r['rows']:>5} "
+              f"{r['rows_per_min']:>9.0f} {r['peak_rss_mb']:>8.1f}")
+    if "emails" in report:
+        r = report["emails"]
+        print(f"\nEmails found: {r['emails_found']} of {r['emails_expected']} reachable "
+              f"(JS-only sites need --workers > 0)")
+    print("\nLogs and outputs are in each scenario's workdir")
+
+    for name, (error, workdir) in failures.items():
+        print(f"\n❌ {name} failed (log in {workdir}/run.log):\n{error}")
+    if failures:
+        sys.exit(1)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, r in report.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            if r["pages_per_sec"] < base["pages_per_sec"] * (1 - TOLERANCE):
+                regressions.append(f"{name}: pages/s {base['pages_per_sec']:.1f} -> {r['pages_per_sec']:.1f}")
+            if r["rows_per_min"] < base["rows_per_min"] * (1 - TOLERANCE):
+                regressions.append(f"{name}: rows/min {base['rows_per_min']:.0f} -> {r['rows_per_min']:.0f}")
+            if r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + TOLERANCE):
+                regressions.append(f"{name}: peak RSS {base['peak_rss_mb']:.0f} MB -> {r['peak_rss_mb']:.0f} MB")
+            if r.get("emails_found", 0) < base.get("emails_found", 0):
+                regressions.append(f"{name}: emails found {base['emails_found']} -> {r['emails_found']}")
+        for line in regressions:
+            print(f"⚠️  Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import timeit
+
+# Micro-benchmark of the listing/detail page parsers on the saved fixtures.
+# Run from the repository root:  python benchmarks/bench_parsers.py [iterations]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import page_parsers  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Function to load a fixture page
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def main(iterations=200):
+    listing = load_fixture("listing_page.html")
+    detail = load_fixture("detail_page.html")
+    backends = page_parsers.available_backends()
+
+    # Every backend has to agree before its timing means anything
+    expected = None
+    for backend in backends:
+        result = (page_parsers.parse_company_cards(listing, backend),
+                  page_parsers.parse_business_details(detail, backend),
+                  page_parsers.parse_total_pages(listing, backend))
+        if expected is None:
+            expected = result
+        elif result != expected:
+            print(f"⚠️  {backend} output differs from {backends[0]}")
+
+    print(f"{len(expected[0])} cards per listing page, {iterations} iterations\n")
+    print(f"{'backend':<12} {'listing ms':>11} {'detail ms':>10} {'pages ms':>9}")
+    for backend in backends:
+        timings = [
+            timeit.timeit(lambda: page_parsers.parse_company_cards(listing, backend), number=iterations),
+            timeit.timeit(lambda: page_parsers.parse_business_details(detail, backend), number=iterations),
+            timeit.timeit(lambda: page_parsers.parse_total_pages(listing, backend), number=iterations),
+        ]
+        listing_ms, detail_ms, pages_ms = (t / iterations * 1000 for t in timings)
+        print(f"{backend:<12} {listing_ms:>11.3f} {detail_ms:>10.3f} {pages_ms:>9.3f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
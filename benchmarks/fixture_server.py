@@ -0,0 +1,258 @@
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for business.ycea-pa.org and the company sites it links to,
+# for reproducible end-to-end benchmarks. The directory is served on
+# 127.0.0.1 with the same gz-* markup as the real one; every business site
+# gets its own loopback address (127.0.0.10, 127.0.0.11, ...) so the
+# per-domain rate limiter, host limits and domain health store see separate
+# domains. Sites cycle through the cases the email pipeline has to handle.
+
+DIRECTORY_HOST = "127.0.0.1"
+SITE_HOST_BASE = 10  # First site is 127.0.0.10
+MAX_SITES = 200  # Sites beyond this reuse addresses
+
+CATEGORIES = 2
+PAGES_PER_CATEGORY = 3
+CARDS_PER_PAGE = 20
+
+LATENCY = 0.02  # Seconds added to every response
+JITTER = 0.01  # Up to this much more, fixed per path so runs repeat
+SLOW_LATENCY = 1.5  # For the "slow" sites
+HANG_SECONDS = 12  # For the "hang" sites; longer than the HTTP tier's read timeout
+
+# What each site does, by business number modulo len(SITE_KINDS)
+SITE_KINDS = [
+    "mailto",  # mailto link on the home page
+    "contact_path",  # email only on /contact
+    "obfuscated",  # "name [at] domain" on /about-us
+    "js_only",  # email only appears after JavaScript runs
+    "slow",  # correct page, served slowly
+    "not_found",  # every page 404s
+    "hang",  # never answers in time
+    "dns_dead",  # domain doesn't resolve
+    "no_website",  # card has no website at all
+    "cfemail",  # Cloudflare-protected address on the home page
+]
+
+FILLER = ("<p>We are a family-owned business serving York County since 1987. Our team offers "
+          "friendly service, fair prices and decades of local experience. Call or stop by "
+          "our office during business hours to talk about your next project.</p>") * 2
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body><nav><a href="/">Home</a> <a href="/about-us">About</a> <a href="/contact">Contact Us</a></nav>
+{body}
+</body></html>"""
+
+# Function to encode an address the way Cloudflare's email protection does
+def cfemail(email, key=0x5a):
+    return f"{key:02x}" + "".join(f"{ord(c) ^ key:02x}" for c in email)
+
+# Function to give a path its fixed extra latency
+def path_latency(path, base=LATENCY, jitter=JITTER):
+    return base + random.Random(zlib.crc32(path.encode())).uniform(0, jitter)
+
+class FixtureServer:
+    """Serve the synthetic directory and company sites on loopback addresses."""
+
+    def __init__(self, categories=CATEGORIES, pages=PAGES_PER_CATEGORY, cards=CARDS_PER_PAGE,
+                 latency=LATENCY, jitter=JITTER, hang_seconds=HANG_SECONDS):
+        self.categories = categories
+        self.pages = pages
+        self.cards = cards
+        self.latency = latency
+        self.jitter = jitter
+        self.hang_seconds = hang_seconds
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._servers = []
+        self.port = None
+
+    # Addresses and URLs
+
+    @property
+    def business_count(self):
+        return self.categories * self.pages * self.cards
+
+    @property
+    def directory_root(self):
+        return f"http://{DIRECTORY_HOST}:{self.port}"
+
+    @property
+    def index_url(self):
+        return f"{self.directory_root}/list"
+
+    def category_url(self, category=0):
+        return f"{self.directory_root}/list/ql/category-{category}"
+
+    def site_host(self, number):
+        return f"127.0.0.{SITE_HOST_BASE + number % MAX_SITES}"
+
+    def site_kind(self, number):
+        return SITE_KINDS[number % len(SITE_KINDS)]
+
+    def website(self, number):
+        kind = self.site_kind(number)
+        if kind == "no_website":
+            return None
+        if kind == "dns_dead":
+            return f"http://business-{number}.invalid/"
+        return f"http://{self.site_host(number)}:{self.port}/"
+
+    def expected_email(self, number):
+        """Return the address a perfect run finds for a business, or None."""
+        if self.site_kind(number) in ("not_found", "hang", "dns_dead", "no_website"):
+            return None
+        return f"info@business{number}.com"
+
+    # Serving
+
+    def start(self):
+        handler = self._handler_class()
+        first = ThreadingHTTPServer((DIRECTORY_HOST, 0), handler)
+        self.port = first.server_address[1]
+        self._servers = [first]
+        for number in range(min(self.business_count, MAX_SITES)):
+            self._servers.append(ThreadingHTTPServer((self.site_host(number), self.port), handler))
+        for server in self._servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                self.respond(head=True)
+
+            def do_GET(self):
+                self.respond()
+
+            def respond(self, head=False):
+                with fixture._lock:
+                    fixture.requests_served += 1
+                host = self.headers.get("Host", "").split(":")[0]
+                status, body, delay = fixture.route(host, self.path)
+                time.sleep(delay)
+                payload = body.encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    if not head:
+                        self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up on a hanging page
+
+        return Handler
+
+    def route(self, host, path):
+        """Return (status, body, delay) for a request."""
+        parsed = urlparse(path)
+        delay = path_latency(host + parsed.path, self.latency, self.jitter)
+        if parsed.path == "/robots.txt":
+            return 200, "User-agent: *\nAllow: /\n", delay
+        if host == DIRECTORY_HOST:
+            return self.route_directory(parsed) + (delay,)
+        number = int(host.rsplit(".", 1)[-1]) - SITE_HOST_BASE
+        kind = self.site_kind(number)
+        if kind == "slow":
+            delay += SLOW_LATENCY
+        elif kind == "hang":
+            delay += self.hang_seconds
+        return self.route_site(number, kind, parsed.path) + (delay,)
+
+    # Directory pages
+
+    def route_directory(self, parsed):
+        if parsed.path == "/list":
+            links = "".join(f'<li><a href="/list/ql/category-{c}">Category {c}</a></li>' for c in range(self.categories))
+            return 200, f"<html><body><ul>{links}</ul></body></html>"
+        if parsed.path.startswith("/list/ql/category-"):
+            category = int(parsed.path.rsplit("-", 1)[-1])
+            page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            if category >= self.categories or not 1 <= page <= self.pages:
+                return 404, "<html><body>Not found</body></html>"
+            return 200, self.listing_page(category, page)
+        if parsed.path.startswith("/list/member/business-"):
+            number = int(parsed.path.rsplit("-", 1)[-1])
+            return 200, self.detail_page(number)
+        return 404, "<html><body>Not found</body></html>"
+
+    def listing_page(self, category, page):
+        first = (category * self.pages + page - 1) * self.cards
+        cards = []
+        for number in range(first, first + self.cards):
+            website = self.website(number)
+            website_li = f'<li class="gz-card-website"><a href="{website}">Visit Website</a></li>' if website else ""
+            cards.append(f"""
+<div class="card gz-results-card">
+  <div class="card-header gz-card-top">
+    <h5 class="card-title gz-card-title"><a href="{self.directory_root}/list/member/business-{number}">Business {number} LLC</a></h5>
+  </div>
+  <div class="card-body gz-results-card-body">
+    <ul class="list-group list-group-flush">
+      <li class="list-group-item gz-card-address">{100 + number} Market St<br>York, PA 17401</li>
+      <li class="list-group-item gz-card-phone">(717) 555-{number:04d}</li>
+      {website_li}
+    </ul>
+  </div>
+</div>""")
+        pagination = "".join(f'<li class="page-item"><a class="page-link" href="?page={p}">{p}</a></li>'
+                             for p in range(1, self.pages + 1))
+        return (f'<html><body><div class="gz-search-results">{"".join(cards)}</div>'
+                f'<ul class="pagination">{pagination}</ul></body></html>')
+
+    def detail_page(self, number):
+        website = self.website(number)
+        website_li = f'<li class="gz-card-website"><a href="{website}">Visit Website</a></li>' if website else ""
+        return f"""<html><body>
+<div class="gz-details-categories"><span class="gz-cat">Professional Services</span></div>
+<ul>{website_li}</ul>
+<a class="card-link" id="gz-directory-contact" href="#contact">Send Email</a>
+</body></html>"""
+
+    # Company sites
+
+    def route_site(self, number, kind, path):
+        email = f"info@business{number}.com"
+        title = f"Business {number}"
+        if kind == "not_found":
+            return 404, "<html><body>Not found</body></html>"
+        if path in ("", "/"):
+            if kind in ("mailto", "slow", "hang"):
+                return 200, PAGE.format(title=title, body=f'{FILLER}<p><a href="mailto:{email}">Email us</a></p>')
+            if kind == "cfemail":
+                return 200, PAGE.format(title=title, body=f'{FILLER}<a class="__cf_email__" data-cfemail="{cfemail(email)}">[email protected]</a>')
+            if kind == "js_only":
+                # The address only exists once the script runs
+                user, domain = email.split("@")
+                return 200, PAGE.format(title=title, body=f"""<div id="app"></div>
+<script>document.getElementById('app').innerHTML = '<p>{FILLER[3:60]}</p><a href="mailto:' + '{user}' + String.fromCharCode(64) + '{domain}' + '">Email</a>';</script>""")
+            return 200, PAGE.format(title=title, body=FILLER)
+        if path == "/contact" and kind == "contact_path":
+            return 200, PAGE.format(title=f"Contact {title}", body=f"{FILLER}<p>Write to {email}</p>")
+        if path == "/about-us" and kind == "obfuscated":
+            return 200, PAGE.format(title=f"About {title}", body=f"{FILLER}<p>Reach us at info [at] business{number} [dot] com</p>")
+        return 404, "<html><body>Not found</body></html>"
@@ -0,0 +1,129 @@
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+# Per-domain record of how email extraction went on earlier runs. Dead or
+# emailless domains are skipped until their outcome expires, and the page
+# that produced an email last time is tried first.
+
+HEALTH_PATH = "domain_health.sqlite3"
+
+DAY = 24 * 60 * 60
+# How long each outcome class is trusted before the domain is tried again
+OUTCOME_TTLS = {
+    "found": 30 * DAY,
+    "no_email": 14 * DAY,
+    "dns_error": 7 * DAY,
+    "timeout": 3 * DAY,
+    "error": 1 * DAY,
+}
+# Outcomes that let a later run skip the domain entirely
+SKIP_OUTCOMES = {"no_email", "dns_error", "timeout", "error"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (
+    domain TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    result TEXT,
+    last_attempt REAL NOT NULL,
+    pages_tried INTEGER NOT NULL,
+    hit_page TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1
+);
+"""
+
+# Function to get the key for a website
+def domain_of(url):
+    """Return the lower-case host of a URL without a leading www."""
+    url = (url or "").strip()
+    if not url.startswith("http"):
+        url = "http://" + url
+    host = urllib.parse.urlparse(url).netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+# Function to sort an extraction result into an outcome class
+def classify_result(result):
+    """Map a result string from add_emails to an outcome class."""
+    text = (result or "").strip()
+    if "@" in text and " " not in text:
+        return "found"
+    lowered = text.lower()
+    if lowered.startswith("no email found") or "parked" in lowered:
+        return "no_email"
+    if "dns" in lowered:
+        return "dns_error"
+    if "timeout" in lowered:
+        return "timeout"
+    return "error"
+
+# SQLite-backed store of per-domain outcomes
+class DomainHealthStore:
+    """Remember each domain's last extraction outcome across runs."""
+
+    def __init__(self, path=HEALTH_PATH, ttls=None):
+        self.path = path
+        self.ttls = dict(OUTCOME_TTLS, **(ttls or {}))
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url):
+        """Return the stored row for a URL's domain as a dict, or None."""
+        row = self._conn().execute("SELECT * FROM domains WHERE domain = ?", (domain_of(url),)).fetchone()
+        return dict(row) if row else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry["last_attempt"] < self.ttls.get(entry["status"], 0)
+
+    def cached_failure(self, url):
+        """Return the last result if the domain recently failed, else None."""
+        entry = self.get(url)
+        if entry and entry["status"] in SKIP_OUTCOMES and self.is_fresh(entry):
+            return entry["result"]
+        return None
+
+    def hit_page(self, url):
+        """Return the path that produced an email for this domain last time."""
+        entry = self.get(url)
+        return entry["hit_page"] if entry else None
+
+    def record(self, url, result, pages_tried=0, hit_page=None):
+        """Store the outcome of one extraction attempt."""
+        domain = domain_of(url)
+        if not domain:
+            return
+        status = classify_result(result)
+        with self._write_lock, self._conn() as conn:
+            previous = conn.execute("SELECT hit_page, attempts FROM domains WHERE domain = ?", (domain,)).fetchone()
+            # Keep the last good page around even through a failed attempt
+            if hit_page is None and previous is not None:
+                hit_page = previous["hit_page"]
+            attempts = previous["attempts"] + 1 if previous is not None else 1
+            conn.execute(
+                "INSERT OR REPLACE INTO domains VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (domain, status, result, time.time(), pages_tried, hit_page, attempts),
+            )
+
+_store = None
+_store_lock = threading.Lock()
+
+# Function to get the process-wide store
+def get_domain_health():
+    """Return the shared DomainHealthStore, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DomainHealthStore()
+    return _store
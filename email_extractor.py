@@ -0,0 +1,150 @@
+import html as html_lib
+import re
+import urllib.parse
+from collections import namedtuple
+
+# Single-pass email extraction for raw HTML. One precompiled pattern finds
+# plain addresses, mailto: links, entity-encoded and "[at]"-obfuscated
+# addresses and Cloudflare-protected ones; candidates are then validated and
+# ranked so the site's own contact address wins over asset names and
+# third-party addresses.
+
+EmailCandidate = namedtuple("EmailCandidate", ["email", "score", "source"])
+
+_LOCAL = r"[\w.+-]+"
+_LABEL = r"[A-Za-z0-9-]+"
+_AT = r"(?:@|&#0*64;|&#x0*40;|&commat;|%40)"
+_BRACKET_AT = r"\s*[\[\(\{]\s*at\s*[\]\)\}]\s*"
+_BRACKET_DOT = r"\s*[\[\(\{]\s*dot\s*[\]\)\}]\s*"
+
+# Order matters: the more specific forms have to win over a plain match
+EMAIL_PATTERN = re.compile(
+    r'data-cfemail="(?P<cf>[0-9a-fA-F]+)"'
+    rf"|mailto:\s*(?P<mailto>{_LOCAL}{_AT}{_LABEL}(?:\.{_LABEL})+)"
+    rf"|(?P<obf>{_LOCAL}{_BRACKET_AT}{_LABEL}(?:(?:{_BRACKET_DOT}|\.){_LABEL})+)"
+    rf"|(?P<plain>{_LOCAL}{_AT}{_LABEL}(?:\.{_LABEL})+)",
+    re.IGNORECASE,
+)
+_BRACKET_AT_PATTERN = re.compile(_BRACKET_AT, re.IGNORECASE)
+_BRACKET_DOT_PATTERN = re.compile(_BRACKET_DOT, re.IGNORECASE)
+_ENTITY_AT_PATTERN = re.compile(_AT, re.IGNORECASE)
+_VALID_PATTERN = re.compile(r"^[a-z0-9._%+-]+@(?:[a-z0-9-]+\.)+[a-z]{2,}$")
+
+# File extensions that look like a TLD in asset names such as logo@2x.png
+ASSET_EXTENSIONS = frozenset("""
+png jpg jpeg gif webp svg ico bmp tif tiff avif heic css js mjs map json xml
+woff woff2 ttf otf eot mp4 webm mov mp3 wav ogg pdf zip
+""".split())
+
+# Addresses that are never real contacts
+PLACEHOLDER_DOMAINS = frozenset({"example.com", "example.org", "yourdomain.com", "domain.com", "email.com", "company.com"})
+PLACEHOLDER_LOCALS = frozenset({"email", "user", "name", "someone", "you", "yourname", "your", "username", "first.last"})
+REJECTED_DOMAINS = frozenset({"sentry.io", "sentry.wixpress.com", "sentry-next.wixpress.com", "wixpress.com"})
+
+# Addresses that belong to a site builder or host rather than the business
+THIRD_PARTY_DOMAINS = frozenset({
+    "wix.com", "squarespace.com", "godaddy.com", "wordpress.com", "wpengine.com",
+    "mailchimp.com", "weebly.com", "shopify.com", "domainsbyproxy.com", "ycea-pa.org",
+})
+ROLE_LOCALS = frozenset({"info", "contact", "office", "hello", "sales", "admin", "mail", "inquiries", "enquiries", "team", "support"})
+
+# Ranking weights
+SCORE_SITE_DOMAIN = 50
+SCORE_SOURCE = {"mailto": 20, "cfemail": 15, "obfuscated": 10, "plain": 0}
+SCORE_ROLE = 10
+SCORE_THIRD_PARTY = -40
+SCORE_REPEAT = 2  # Per extra occurrence, up to SCORE_REPEAT_MAX
+SCORE_REPEAT_MAX = 6
+
+# Function to decode a Cloudflare data-cfemail value
+def decode_cfemail(encoded):
+    """Decode Cloudflare's XOR-obfuscated email hex string."""
+    key = int(encoded[:2], 16)
+    return "".join(chr(int(encoded[i:i + 2], 16) ^ key) for i in range(2, len(encoded), 2))
+
+# Function to get the registrable part of a hostname (good enough for .com/.org sites)
+def base_domain(host):
+    host = (host or "").lower().split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    return ".".join(host.split(".")[-2:])
+
+# Function to turn a raw match into a clean address, or None
+def normalize_email(raw):
+    email = html_lib.unescape(urllib.parse.unquote(raw)).strip().strip(".").lower()
+    email = _ENTITY_AT_PATTERN.sub("@", email)
+    local, _, domain = email.partition("@")
+    if not local or not domain:
+        return None
+    if not _VALID_PATTERN.match(email):
+        return None
+    if domain.rsplit(".", 1)[-1] in ASSET_EXTENSIONS:
+        return None  # Catches asset names like logo@2x.png
+    if domain in PLACEHOLDER_DOMAINS or local in PLACEHOLDER_LOCALS:
+        return None
+    if domain in REJECTED_DOMAINS or base_domain(domain) in REJECTED_DOMAINS:
+        return None
+    return email
+
+# Function to score one address
+def score_email(email, source, count, site_domain=None):
+    local, _, domain = email.partition("@")
+    score = SCORE_SOURCE[source]
+    if site_domain and base_domain(domain) == site_domain:
+        score += SCORE_SITE_DOMAIN
+    if local in ROLE_LOCALS:
+        score += SCORE_ROLE
+    if base_domain(domain) in THIRD_PARTY_DOMAINS:
+        score += SCORE_THIRD_PARTY
+    score += min(SCORE_REPEAT_MAX, SCORE_REPEAT * (count - 1))
+    return score
+
+# Function to find and rank every email address in an HTML string
+def extract_emails(html, site_url=None):
+    """Return EmailCandidates for every address in the HTML, best first."""
+    site_domain = base_domain(urllib.parse.urlparse(site_url).netloc) if site_url else None
+    found = {}  # email -> [best source, count, first position]
+    for position, match in enumerate(EMAIL_PATTERN.finditer(html)):
+        kind = match.lastgroup
+        raw = match.group(kind)
+        if kind == "cf":
+            try:
+                raw, source = decode_cfemail(raw), "cfemail"
+            except ValueError:
+                continue
+        elif kind == "obf":
+            raw = _BRACKET_DOT_PATTERN.sub(".", _BRACKET_AT_PATTERN.sub("@", raw))
+            source = "obfuscated"
+        else:
+            source = kind
+        email = normalize_email(raw)
+        if not email:
+            continue
+        if email in found:
+            entry = found[email]
+            entry[1] += 1
+            if SCORE_SOURCE[source] > SCORE_SOURCE[entry[0]]:
+                entry[0] = source
+        else:
+            found[email] = [source, 1, position]
+
+    candidates = [
+        (EmailCandidate(email, score_email(email, source, count, site_domain), source), position)
+        for email, (source, count, position) in found.items()
+    ]
+    # Highest score first; ties go to the address that appeared first
+    candidates.sort(key=lambda item: (-item[0].score, item[1]))
+    return [candidate for candidate, _ in candidates]
+
+# Function to write candidates into one CSV-friendly string
+def format_candidates(candidates):
+    return "; ".join(f"{c.email} ({c.score})" for c in candidates)
+
+# Function to combine candidates gathered from several pages
+def merge_candidates(candidates):
+    """Keep each address once with its best score, best first."""
+    best = {}
+    for candidate in candidates:
+        if candidate.email not in best or candidate.score > best[candidate.email].score:
+            best[candidate.email] = candidate
+    return sorted(best.values(), key=lambda c: -c.score)
@@ -0,0 +1,249 @@
+import asyncio
+import random
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from page_cache import PageCache
+from metrics import get_metrics
+import rate_limiter
+
+# Shared HTTP session used by every fetch in the scrapers. One pooled session
+# keeps connections alive between requests so each page doesn't pay for a new
+# TCP+TLS handshake.
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
+
+# urllib3 only decodes brotli responses when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+# Connection pool settings
+POOL_CONNECTIONS = 20  # Number of hosts to keep pools for
+POOL_MAXSIZE = 20  # Connections kept alive per host
+
+# Timeouts in seconds
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 20
+
+# Retry settings
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0  # Seconds before the first retry
+BACKOFF_MAX = 30.0  # Upper bound for any single wait
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Response cache settings
+CACHE_ENABLED = True
+CACHE_OFFLINE = False  # Replay from cache only; never touch the network
+CACHEABLE_STATUSES = {200, 203, 404, 410}
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+
+# Raised in offline mode when a URL was never cached
+class OfflineCacheMiss(requests.ConnectionError):
+    pass
+
+# Function to change the cache settings before a run
+def configure_cache(enabled=True, offline=False, **cache_options):
+    """Turn the response cache on or off, or switch to offline replay.
+
+    Extra keyword arguments (path, ttl, max_bytes, max_age) go to PageCache.
+    """
+    global CACHE_ENABLED, CACHE_OFFLINE, _cache
+    CACHE_ENABLED = enabled or offline
+    CACHE_OFFLINE = offline
+    with _session_lock:
+        _cache = PageCache(**cache_options) if CACHE_ENABLED else None
+
+# Function to get the shared cache
+def get_cache():
+    """Return the shared PageCache, or None when caching is off."""
+    global _cache
+    if CACHE_ENABLED and _cache is None:
+        with _session_lock:
+            if _cache is None:
+                _cache = PageCache()
+    return _cache if CACHE_ENABLED else None
+
+# Function to rebuild a response object from a cache entry
+def response_from_cache(entry):
+    """Return a requests.Response holding a cached status, headers and body."""
+    response = requests.models.Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response._content = entry["body"]
+    response.url = entry["final_url"]
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+# Function to build a pooled session
+def create_session():
+    """Create a requests session with keep-alive pools and compression."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Connection": "keep-alive",
+    })
+    return session
+
+# Function to get the process-wide shared session
+def get_session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+# Function to work out how long to wait before the next attempt
+def backoff_delay(attempt, response=None):
+    """Exponential backoff with full jitter, honouring a numeric Retry-After."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+# Function to fetch a URL with timeouts and retries
+def fetch(url, method="GET", timeout=None, retries=MAX_RETRIES, use_cache=True, rate_limit=True, **kwargs):
+    """Fetch a URL through the shared session.
+
+    GET and HEAD requests are answered from the page cache while the entry
+    is fresh, and stale entries are revalidated with ETag/Last-Modified.
+    Network requests wait for their domain's turn in the rate limiter.
+    Retries connection errors, timeouts and 429/5xx responses with
+    exponential backoff. Returns the last response, or raises the last
+    exception if no attempt got a response.
+    """
+    cache = get_cache() if use_cache and method in ("GET", "HEAD") else None
+    entry = cache.get(url) if cache else None
+
+    if cache and CACHE_OFFLINE:
+        if entry is None:
+            raise OfflineCacheMiss(f"{url} is not in the cache")
+        get_metrics().count("http_cache.hit")
+        return response_from_cache(entry)
+    if entry is not None and cache.is_fresh(entry):
+        get_metrics().count("http_cache.hit")
+        return response_from_cache(entry)
+
+    # Ask the server whether our stale copy is still good
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None and method == "GET":
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+    scheduler = get_rate_limiter() if rate_limit else None
+    response = _fetch_with_retries(url, method, timeout, retries, scheduler, headers=headers, **kwargs)
+
+    if cache and method == "GET":
+        if response.status_code == 304 and entry is not None:
+            cache.touch(url)
+            get_metrics().count("http_cache.revalidated")
+            return response_from_cache(entry)
+        if response.status_code in CACHEABLE_STATUSES:
+            cache.put(url, response.status_code, response.headers, response.content, response.url)
+    return response
+
+# Function to read robots.txt for the rate limiter
+def _fetch_robots(url):
+    # Robots files bypass the limiter, which is what asked for them
+    return fetch(url, timeout=(CONNECT_TIMEOUT, 10), retries=0, rate_limit=False)
+
+# Function to get the shared per-domain rate limiter
+def get_rate_limiter():
+    """Return the shared DomainScheduler, or None when rate limiting is off."""
+    if not rate_limiter.RATE_LIMITING:
+        return None
+    return rate_limiter.get_scheduler(robots_fetcher=_fetch_robots)
+
+# Function that does the actual network request with retries
+def _fetch_with_retries(url, method, timeout, retries, scheduler=None, **kwargs):
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    session = get_session()
+    metrics = get_metrics()
+
+    for attempt in range(retries + 1):
+        if scheduler:
+            with metrics.timer("rate_limit_wait"):
+                scheduler.acquire(url)
+        started = time.monotonic()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.record_time("http_request", time.monotonic() - started, error=type(e).__name__)
+            if scheduler:
+                scheduler.record(url, time.monotonic() - started)
+            if attempt == retries:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"Request to {url} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            metrics.record_time("backoff_sleep", delay)
+            time.sleep(delay)
+            continue
+        metrics.record_time("http_request", time.monotonic() - started, status=response.status_code)
+
+        if scheduler:
+            retry_after = response.headers.get("Retry-After", "").strip()
+            scheduler.record(url, response.elapsed.total_seconds(), response.status_code,
+                             float(retry_after) if retry_after.isdigit() else None)
+
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            delay = backoff_delay(attempt, response)
+            print(f"Got {response.status_code} from {url}, retrying in {delay:.1f}s")
+            response.close()
+            metrics.record_time("backoff_sleep", delay)
+            time.sleep(delay)
+            continue
+
+        return response
+
+# Async fetcher that runs blocking fetches in threads under concurrency limits
+class AsyncFetcher:
+    """Fetch URLs concurrently with a global limit and a per-host limit."""
+    
+    def __init__(self, concurrency=10, per_host=4):
+        self.global_limit = asyncio.Semaphore(concurrency)
+        self.per_host = per_host
+        self.host_limits = {}
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+    
+    def _host_limit(self, url):
+        host = urllib.parse.urlparse(url).netloc
+        if host not in self.host_limits:
+            self.host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self.host_limits[host]
+    
+    async def get(self, url, **kwargs):
+        """Fetch a URL without blocking the event loop."""
+        # Take the host slot first so a busy host can't hold global slots idle
+        async with self._host_limit(url):
+            async with self.global_limit:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.executor, lambda: fetch(url, **kwargs)
+                )
+    
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,161 @@
+import asyncio
+import functools
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Lightweight run instrumentation shared by both scripts. Stage timings,
+# counters and per-site observations are kept in memory for the end-of-run
+# report, and each event is also appended to a JSONL file so a run can be
+# analysed afterwards.
+
+METRICS_ENABLED = True
+PERCENTILES = (50, 95, 99)
+
+# Function to read a percentile off sorted values (nearest-rank)
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+# Function to summarise one list of values
+def describe(values):
+    values = sorted(values)
+    summary = {"count": len(values), "total": sum(values), "mean": sum(values) / len(values) if values else None}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = percentile(values, p)
+    summary["max"] = values[-1] if values else None
+    return summary
+
+# Collector for one run
+class Metrics:
+    """Thread-safe stage timings, counters and observations for a run."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.started = time.time()
+        self.timings = {}  # stage -> [seconds]
+        self.counters = {}  # name -> count
+        self.observations = {}  # name -> [value]
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def _emit(self, event):
+        if self._file:
+            self._file.write(json.dumps({"time": time.time(), **event}) + "\n")
+
+    def record_time(self, stage, seconds, **fields):
+        with self._lock:
+            self.timings.setdefault(stage, []).append(seconds)
+            self._emit({"type": "timing", "stage": stage, "seconds": round(seconds, 6), **fields})
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            self._emit({"type": "count", "name": name, "n": n})
+
+    def observe(self, name, value, **fields):
+        with self._lock:
+            self.observations.setdefault(name, []).append(value)
+            self._emit({"type": "observation", "name": name, "value": value, **fields})
+
+    @contextmanager
+    def timer(self, stage, **fields):
+        """Time the body of a with block as one sample of stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(stage, time.perf_counter() - started, **fields)
+
+    def rate_per_minute(self, counter):
+        minutes = (time.time() - self.started) / 60
+        return self.counters.get(counter, 0) / minutes if minutes > 0 else 0.0
+
+    def summary(self, rate_counter="rows"):
+        """Return the run summary as a JSON-friendly dict."""
+        with self._lock:
+            return {
+                "elapsed_seconds": time.time() - self.started,
+                f"{rate_counter}_per_minute": self.rate_per_minute(rate_counter),
+                "stages": {stage: describe(values) for stage, values in sorted(self.timings.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "observations": {name: describe(values) for name, values in sorted(self.observations.items())},
+            }
+
+    def report(self, title="Run report", rate_counter="rows"):
+        """Print the summary, write it as the last JSONL line, and return it."""
+        summary = self.summary(rate_counter)
+        print(f"\n📊 {title}: {summary['elapsed_seconds']:.1f}s, "
+              f"{summary[f'{rate_counter}_per_minute']:.1f} {rate_counter}/min")
+        if summary["stages"]:
+            print(f"{'stage':<30} {'count':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+            for stage, s in summary["stages"].items():
+                print(f"{stage:<30} {s['count']:>6} {s['total']:>9.1f} "
+                      f"{s['p50'] * 1000:>9.1f} {s['p95'] * 1000:>9.1f} {s['p99'] * 1000:>9.1f}")
+        for name, s in summary["observations"].items():
+            print(f"{name}: mean {s['mean']:.2f}, p50 {s['p50']}, p95 {s['p95']}, max {s['max']}")
+        for name, n in summary["counters"].items():
+            print(f"{name}: {n}")
+        with self._lock:
+            self._emit({"type": "summary", **summary})
+        return summary
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+# Stand-in used when metrics are turned off
+class NullMetrics(Metrics):
+    def __init__(self):
+        super().__init__(path=None)
+
+    def record_time(self, stage, seconds, **fields):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def observe(self, name, value, **fields):
+        pass
+
+_metrics = None
+
+# Function to start collecting for a run
+def configure_metrics(path=None, enabled=True):
+    """Replace the shared collector; events go to path when one is given."""
+    global _metrics
+    if _metrics is not None:
+        _metrics.close()
+    _metrics = Metrics(path) if enabled and METRICS_ENABLED else NullMetrics()
+    return _metrics
+
+# Function to get the shared collector
+def get_metrics():
+    """Return the shared Metrics, creating an in-memory one on first use."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics() if METRICS_ENABLED else NullMetrics()
+    return _metrics
+
+# Decorator to time every call of a function as one stage
+def timed(stage):
+    """Record each call's duration under stage; works on plain and async functions."""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_metrics().timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
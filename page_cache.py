@@ -0,0 +1,120 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# On-disk cache of HTTP responses shared by scraper.py and add_emails.py.
+# Entries are keyed by a hash of the URL and hold the decoded body, headers,
+# status and fetch time, so parsers can be re-run without hitting the network.
+
+CACHE_PATH = "http_cache.sqlite3"
+CACHE_TTL = 24 * 60 * 60  # Seconds an entry is served without revalidation
+CACHE_MAX_AGE = 30 * 24 * 60 * 60  # Entries older than this are deleted outright
+CACHE_MAX_BYTES = 500 * 1024 * 1024  # Least recently used entries are evicted past this size
+EVICT_EVERY = 100  # Check the size limit after this many writes
+
+# Headers that describe the wire encoding, which no longer applies to the stored body
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    final_url TEXT,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+"""
+
+# Function to turn a URL into a cache key
+def cache_key(url):
+    """Return the SHA-256 hex digest of a URL."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+# SQLite-backed page cache that can be shared between threads
+class PageCache:
+    """Store and look up HTTP responses by URL."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writes = 0
+        with self._write_lock:
+            self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        # sqlite3 connections can't be shared across threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url):
+        """Return the cached entry for a URL as a dict, or None."""
+        row = self._conn().execute("SELECT * FROM pages WHERE key = ?", (cache_key(url),)).fetchone()
+        if row is None:
+            return None
+        with self._write_lock, self._conn() as conn:
+            conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), row["key"]))
+        entry = dict(row)
+        entry["headers"] = json.loads(entry["headers"])
+        return entry
+
+    def is_fresh(self, entry):
+        """Return True if an entry is younger than the TTL."""
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def put(self, url, status, headers, body, final_url=None):
+        """Store a response, replacing any earlier entry for the URL."""
+        headers = {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+        with self._write_lock, self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(url), url, final_url or url, status, json.dumps(headers),
+                 body, len(body), now, now),
+            )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict(conn)
+
+    def touch(self, url):
+        """Mark an entry as just revalidated (after a 304)."""
+        now = time.time()
+        with self._write_lock, self._conn() as conn:
+            conn.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE key = ?",
+                         (now, now, cache_key(url)))
+
+    def evict(self):
+        """Drop entries past max_age, then least recently used ones past max_bytes."""
+        with self._write_lock, self._conn() as conn:
+            self._evict(conn)
+
+    def _evict(self, conn):
+        conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.max_age,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        to_free = total - self.max_bytes
+        victims = []
+        for row in conn.execute("SELECT key, size FROM pages ORDER BY last_access"):
+            victims.append((row["key"],))
+            to_free -= row["size"]
+            if to_free <= 0:
+                break
+        conn.executemany("DELETE FROM pages WHERE key = ?", victims)
+        print(f"Evicted {len(victims)} pages from the HTTP cache")
@@ -0,0 +1,240 @@
+import re
+import urllib.parse
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Parsers for the directory's listing and detail pages. The backend can be
+# switched between BeautifulSoup with html.parser, BeautifulSoup with lxml,
+# and selectolax; all of them return the same fields.
+
+PARSER_BACKEND = None  # "html.parser", "lxml", "selectolax", or None for the fastest installed
+SITE_ROOT = "https://business.ycea-pa.org"
+
+# selectolax is optional; it is much faster but not always installed.
+# Newer releases only ship the lexbor engine, older ones only the modest one.
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+# lxml is optional too
+try:
+    import lxml  # noqa: F401
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+# Function to match any of several classes inside a class attribute
+def class_pattern(*names):
+    # Newer BeautifulSoup releases hand strainers the whole class string,
+    # older ones each class separately; a word-bounded regex works for both
+    return re.compile(r"(^|\s)(" + "|".join(map(re.escape, names)) + r")(\s|$)")
+
+# Only build the parts of each page the parsers read. Listing cards keep their
+# div.card wrapper so a card's body is looked up among its own siblings only
+LISTING_STRAINER = SoupStrainer("div", class_=class_pattern("card", "gz-results-card", "gz-card-top", "card-body"))
+PAGINATION_STRAINER = SoupStrainer("ul", class_=class_pattern("pagination"))
+DETAIL_STRAINER = SoupStrainer(class_=class_pattern("gz-details-categories", "gz-card-website", "card-link"))
+
+# Precompiled selectors for the gz-* classes
+CARD_TOP = "div.gz-card-top"
+CARD_TITLE_LINK = "h5.card-title a"
+CARD_ADDRESS = "li.gz-card-address"
+CARD_PHONE = "li.gz-card-phone"
+CARD_WEBSITE_LINK = "li.gz-card-website a"
+DETAIL_CATEGORY = "div.gz-details-categories span.gz-cat"
+DETAIL_CONTACT = "a.card-link#gz-directory-contact"
+PAGINATION_LINKS = "ul.pagination a"
+
+SELECTORS = {css: soupsieve.compile(css) for css in [
+    CARD_TOP, CARD_TITLE_LINK, CARD_ADDRESS, CARD_PHONE, CARD_WEBSITE_LINK,
+    DETAIL_CATEGORY, DETAIL_CONTACT, PAGINATION_LINKS,
+]}
+
+# Function to list the backends that can run here
+def available_backends():
+    """Return the installed backend names, slowest to fastest."""
+    backends = ["html.parser"]
+    if HAVE_LXML:
+        backends.append("lxml")
+    if HTMLParser is not None:
+        backends.append("selectolax")
+    return backends
+
+# Function to pick the backend to use for a call
+def resolve_backend(backend=None):
+    """Return the requested backend, falling back to html.parser if it isn't installed."""
+    backend = backend or PARSER_BACKEND or available_backends()[-1]
+    if backend not in available_backends():
+        print(f"Parser backend '{backend}' is not available, using html.parser")
+        return "html.parser"
+    return backend
+
+# Function to make a relative detail link absolute
+def absolute_detail_url(href):
+    if href and not href.startswith("http"):
+        return urllib.parse.urljoin(SITE_ROOT, href)
+    return href
+
+# Function to build the card dict every backend returns
+def make_card(name, detail_url, address, phone, website):
+    return {
+        "Name": name,
+        "Address": address,
+        "Phone": phone,
+        "Website": website,
+        "Detail_URL": detail_url
+    }
+
+# Function to clean the category label
+def clean_category(text):
+    return text.strip().replace('"', '').replace("::after", "")
+
+# Function to pull the basic card fields out of a listing page
+def parse_company_cards(html, backend=None):
+    """Parse a listing page into card dicts (no detail page data yet)."""
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        return _cards_selectolax(html)
+    return _cards_soup(html, backend)
+
+# Function to pull category, website and contact info out of a detail page
+def parse_business_details(html, backend=None):
+    """Parse a detail page into (category, website, email)."""
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        return _details_selectolax(html)
+    return _details_soup(html, backend)
+
+# Function to read the last page number from a listing page
+def parse_total_pages(html, backend=None):
+    """Return the highest page number in a listing page's pagination."""
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        links = [node.text() for node in HTMLParser(html).css(PAGINATION_LINKS)]
+    else:
+        soup = BeautifulSoup(html, backend, parse_only=PAGINATION_STRAINER)
+        links = [link.text for link in SELECTORS[PAGINATION_LINKS].select(soup)]
+    page_numbers = [int(text) for text in links if text.isdigit()]
+    return max(page_numbers) if page_numbers else 1  # Default to 1 if no pagination is found
+
+def _cards_soup(html, backend):
+    soup = BeautifulSoup(html, backend, parse_only=LISTING_STRAINER)
+    cards = []
+    for card in SELECTORS[CARD_TOP].select(soup):
+        try:
+            # Extract name and detail page URL
+            name = None
+            detail_url = None
+            name_link = SELECTORS[CARD_TITLE_LINK].select_one(card)
+            if name_link:
+                name = name_link.text.strip()
+                detail_url = absolute_detail_url(name_link.get("href"))
+
+            # Find the corresponding body section
+            body_div = card.find_next_sibling("div", class_="card-body")
+
+            address = None
+            phone = None
+            website = None
+            if body_div:
+                address_li = SELECTORS[CARD_ADDRESS].select_one(body_div)
+                if address_li:
+                    address = address_li.text.strip()
+                phone_li = SELECTORS[CARD_PHONE].select_one(body_div)
+                if phone_li:
+                    phone = phone_li.text.strip()
+                website_link = SELECTORS[CARD_WEBSITE_LINK].select_one(body_div)
+                if website_link:
+                    website = website_link.get("href", "").strip()
+
+            cards.append(make_card(name, detail_url, address, phone, website))
+        except Exception as e:
+            print(f"Error scraping a company: {e}")
+    return cards
+
+def _details_soup(html, backend):
+    soup = BeautifulSoup(html, backend, parse_only=DETAIL_STRAINER)
+
+    category = None
+    cat_span = SELECTORS[DETAIL_CATEGORY].select_one(soup)
+    if cat_span:
+        category = clean_category(cat_span.text)
+
+    website = None
+    website_link = SELECTORS[CARD_WEBSITE_LINK].select_one(soup)
+    if website_link:
+        website = website_link.get("href", "").strip()
+
+    # The contact form can't give us the address without submitting it,
+    # so we only note that one exists
+    email = None
+    if SELECTORS[DETAIL_CONTACT].select_one(soup):
+        email = "Contact form available"
+
+    return category, website, email
+
+# Function to tidy selectolax text the way BeautifulSoup's output looks
+def _selectolax_text(node):
+    # selectolax keeps the indentation after line breaks; BeautifulSoup doesn't
+    return re.sub(r"\n\s*", "\n", node.text()).strip()
+
+# Function to find a selectolax card's body, which is a later sibling
+def _next_card_body(node):
+    sibling = node.next
+    while sibling is not None:
+        if sibling.tag == "div" and "card-body" in (sibling.attributes.get("class") or "").split():
+            return sibling
+        sibling = sibling.next
+    return None
+
+def _cards_selectolax(html):
+    tree = HTMLParser(html)
+    cards = []
+    for card in tree.css(CARD_TOP):
+        try:
+            name = None
+            detail_url = None
+            name_link = card.css_first(CARD_TITLE_LINK)
+            if name_link:
+                name = _selectolax_text(name_link)
+                detail_url = absolute_detail_url(name_link.attributes.get("href"))
+
+            address = None
+            phone = None
+            website = None
+            body_div = _next_card_body(card)
+            if body_div:
+                address_li = body_div.css_first(CARD_ADDRESS)
+                if address_li:
+                    address = _selectolax_text(address_li)
+                phone_li = body_div.css_first(CARD_PHONE)
+                if phone_li:
+                    phone = _selectolax_text(phone_li)
+                website_link = body_div.css_first(CARD_WEBSITE_LINK)
+                if website_link:
+                    website = (website_link.attributes.get("href") or "").strip()
+
+            cards.append(make_card(name, detail_url, address, phone, website))
+        except Exception as e:
+            print(f"Error scraping a company: {e}")
+    return cards
+
+def _details_selectolax(html):
+    tree = HTMLParser(html)
+
+    category = None
+    cat_span = tree.css_first(DETAIL_CATEGORY)
+    if cat_span:
+        category = clean_category(cat_span.text())
+
+    website = None
+    website_link = tree.css_first(CARD_WEBSITE_LINK)
+    if website_link:
+        website = (website_link.attributes.get("href") or "").strip()
+
+    email = "Contact form available" if tree.css_first(DETAIL_CONTACT) else None
+    return category, website, email
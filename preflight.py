@@ -0,0 +1,170 @@
+import asyncio
+import re
+import socket
+import sys
+import urllib.parse
+from collections import namedtuple
+import requests
+from http_session import AsyncFetcher, CONNECT_TIMEOUT
+from metrics import get_metrics
+
+# Pre-flight reachability triage for the Website column. Every distinct site
+# gets one DNS lookup and one HEAD request before any browser starts, so
+# parked, expired and mistyped domains are dropped in seconds instead of
+# costing a 20 s page-load timeout and a second www. attempt each.
+
+DNS_CONCURRENCY = 50
+DNS_TIMEOUT = 5
+PROBE_CONCURRENCY = 30
+PROBE_PER_HOST = 2
+PROBE_TIMEOUT = (CONNECT_TIMEOUT, 8)
+
+# Errors that mean the domain doesn't resolve at all
+DNS_ERROR_MARKERS = (
+    'NameResolutionError', 'Name or service not known', 'nodename nor servname',
+    'getaddrinfo failed', 'No address associated', 'ERR_NAME_NOT_RESOLVED'
+)
+
+# Hosts that expired domains get redirected to; subdomains of these match too
+PARKED_HOSTS = (
+    'sedoparking.com', 'parkingcrew.net', 'bodis.com', 'hugedomains.com', 'dan.com',
+    'afternic.com', 'parklogic.com', 'above.com', 'domainmarket.com'
+)
+
+# Triage result for one site. status is "reachable", "redirected" or "dead";
+# url is the address to use from here on; reason explains a dead site and is
+# written to the Email column as its result
+PreflightResult = namedtuple("PreflightResult", ["status", "url", "reason"])
+
+# Function to tell a DNS failure from other network errors
+def is_dns_error(error):
+    message = str(error)
+    return any(marker in message for marker in DNS_ERROR_MARKERS)
+
+# Function to put a website URL into one canonical form
+def normalize_url(url):
+    """Return the URL with a scheme, a lower-case host and no fragment, or None."""
+    if not isinstance(url, str) or not url.strip():
+        return None
+    url = url.strip()
+    if not re.match(r'^https?://', url, re.IGNORECASE):
+        url = 'http://' + url
+    parsed = urllib.parse.urlparse(url)
+    try:
+        host, port = parsed.hostname, parsed.port
+    except ValueError:
+        return None
+    if not host or '.' not in host:
+        return None
+    netloc = f"{host}:{port}" if port else host
+    return urllib.parse.urlunparse((parsed.scheme.lower(), netloc, parsed.path.rstrip('/') or '/', '', parsed.query, ''))
+
+# Function to spot a parking or domain-sale page
+def is_parked(url):
+    host = (urllib.parse.urlparse(url).hostname or "").lower()
+    return any(host == parked or host.endswith("." + parked) for parked in PARKED_HOSTS)
+
+# Concurrent DNS + HEAD triage over a batch of sites
+class Preflight:
+    """Sort websites into reachable, redirected and dead."""
+
+    def __init__(self, dns_concurrency=DNS_CONCURRENCY, probe_concurrency=PROBE_CONCURRENCY, per_host=PROBE_PER_HOST):
+        self.dns_limit = asyncio.Semaphore(dns_concurrency)
+        self.fetcher = AsyncFetcher(probe_concurrency, per_host)
+        self.dns_cache = {}  # host -> task resolving to True/False
+
+    async def _lookup(self, host):
+        async with self.dns_limit:
+            loop = asyncio.get_running_loop()
+            try:
+                with get_metrics().timer("preflight_dns"):
+                    await asyncio.wait_for(loop.getaddrinfo(host, None, type=socket.SOCK_STREAM), DNS_TIMEOUT)
+                return True
+            except (OSError, asyncio.TimeoutError):
+                return False
+
+    async def resolves(self, host):
+        """Return whether a host has an address; each host is looked up once."""
+        if host not in self.dns_cache:
+            self.dns_cache[host] = asyncio.ensure_future(self._lookup(host))
+        return await self.dns_cache[host]
+
+    async def check(self, url):
+        """Triage one normalized URL."""
+        parsed = urllib.parse.urlparse(url)
+        host = parsed.hostname
+        candidates = [url]
+        if not host.startswith('www.'):
+            candidates.append(parsed._replace(netloc='www.' + parsed.netloc).geturl())
+        for candidate in candidates:
+            if await self.resolves(urllib.parse.urlparse(candidate).hostname):
+                break
+        else:
+            return PreflightResult("dead", url, "Website DNS lookup failed")
+
+        try:
+            with get_metrics().timer("preflight_head"):
+                # A live answer only: no robots.txt fetch first, and no cached page standing in for it
+                response = await self.fetcher.get(candidate, method="HEAD", allow_redirects=True,
+                                                  timeout=PROBE_TIMEOUT, retries=0,
+                                                  rate_limit=False, use_cache=False)
+        except requests.exceptions.SSLError:
+            # The server answered; let the extraction tiers deal with the certificate
+            return PreflightResult("reachable", candidate, None)
+        except requests.Timeout:
+            return PreflightResult("dead", url, "Website timeout")
+        except Exception as e:
+            if is_dns_error(e):
+                return PreflightResult("dead", url, "Website DNS lookup failed")
+            return PreflightResult("dead", url, "Website unreachable")
+
+        # Any HTTP answer means the server is up, even a 405 for HEAD
+        final_url = normalize_url(response.url) or candidate
+        if is_parked(final_url):
+            return PreflightResult("dead", url, "Website parked")
+        if final_url != url:
+            return PreflightResult("redirected", final_url, None)
+        return PreflightResult("reachable", url, None)
+
+    async def triage(self, urls):
+        """Return {url: PreflightResult} for every URL, probing each site once."""
+        normalized = {url: normalize_url(url) for url in urls}
+        unique = sorted({n for n in normalized.values() if n})
+        checked = dict(zip(unique, await asyncio.gather(*(self.check(n) for n in unique))))
+        return {
+            url: checked[n] if n else PreflightResult("dead", url, "Invalid website URL")
+            for url, n in normalized.items()
+        }
+
+    def close(self):
+        self.fetcher.close()
+
+# Function to triage a list of websites from synchronous code
+def triage_websites(urls):
+    """Run Preflight.triage with its own event loop."""
+    async def run():
+        preflight = Preflight()
+        try:
+            return await preflight.triage(urls)
+        finally:
+            preflight.close()
+    return asyncio.run(run())
+
+# Function to count results by status
+def summarize(results):
+    counts = {"reachable": 0, "redirected": 0, "dead": 0}
+    for result in results.values():
+        counts[result.status] += 1
+    return counts
+
+# Run the triage on its own to see how many sites are worth visiting
+if __name__ == "__main__":
+    import pandas as pd
+
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "ycea_business_directory.csv"
+    websites = pd.read_csv(csv_file)['Website'].dropna().unique().tolist()
+    results = triage_websites(websites)
+    for url, result in sorted(results.items()):
+        if result.status != "reachable":
+            print(f"{result.status:<10} {url} -> {result.reason or result.url}")
+    print(summarize(results))
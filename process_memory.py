@@ -0,0 +1,72 @@
+import os
+
+# Resident memory of a process and everything it started, used to decide
+# when a browser has grown enough to be worth relaunching. psutil is used
+# when installed; otherwise Linux's /proc is read directly. Where neither
+# works the functions return None and callers fall back to fixed limits.
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROC = "/proc"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Function to map each process to its children by reading /proc
+def _proc_children():
+    children = {}
+    for entry in os.listdir(PROC):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"{PROC}/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue  # The process exited while we were looking
+        # The command name is in parentheses and may contain spaces
+        fields = stat[stat.rfind(b")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+# Function to read one process's resident memory from /proc
+def _proc_rss(pid):
+    try:
+        with open(f"{PROC}/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+# Function to list a process and all of its descendants
+def process_tree(pid):
+    """Return the pids of a process and everything below it, or [] if unknown."""
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            return [pid] + [child.pid for child in parent.children(recursive=True)]
+        except psutil.Error:
+            return []
+    if not os.path.isdir(PROC):
+        return []
+    children = _proc_children()
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+# Function to add up the resident memory of a process tree
+def process_tree_rss(pid):
+    """Return the total RSS in bytes of a process and its descendants, or None."""
+    if psutil is not None:
+        total = 0
+        for child_pid in process_tree(pid):
+            try:
+                total += psutil.Process(child_pid).memory_info().rss
+            except psutil.Error:
+                continue
+        return total or None
+    if not os.path.isdir(f"{PROC}/{pid}"):
+        return None
+    return sum(_proc_rss(child_pid) for child_pid in process_tree(pid)) or None
@@ -0,0 +1,149 @@
+import threading
+import time
+import urllib.parse
+import urllib.robotparser
+
+# Per-domain politeness scheduler shared by every fetch. Each domain gets its
+# own token bucket, so requests to different company sites run in parallel
+# while any single site only sees a few requests per second.
+
+RATE_LIMITING = True
+DEFAULT_RATE = 2.0  # Requests per second a new domain starts at
+MIN_RATE = 0.1  # Never slow a domain below this
+MAX_RATE = 8.0  # Never speed a domain above this
+BURST = 2  # Requests a domain can take back to back after being idle
+FAST_LATENCY = 0.5  # Responses faster than this speed the domain up
+SLOW_LATENCY = 3.0  # Responses slower than this slow the domain down
+RATE_INCREASE = 0.25  # Requests/second added after a fast response
+RATE_DECREASE = 0.5  # Factor applied after a slow response, error or 429/503
+THROTTLE_STATUSES = {429, 503}
+THROTTLE_PAUSE = 10.0  # Seconds to pause a domain after 429/503 without Retry-After
+RESPECT_ROBOTS = True
+ROBOTS_USER_AGENT = "*"
+
+# Token bucket for one domain
+class DomainBucket:
+    """Rate state for a single domain."""
+
+    def __init__(self, rate=DEFAULT_RATE, max_rate=MAX_RATE, capacity=BURST):
+        self.rate = min(rate, max_rate)
+        self.max_rate = max_rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self):
+        """Take a token if one is free; otherwise return seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def speed_up(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+    def slow_down(self, pause=0.0):
+        with self.lock:
+            self.rate = max(MIN_RATE, self.rate * RATE_DECREASE)
+            self.tokens = min(self.tokens, 0)
+            if pause:
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+# Scheduler that hands out per-domain tokens
+class DomainScheduler:
+    """Block callers until their domain may be hit again, adapting each domain's rate."""
+
+    def __init__(self, robots_fetcher=None):
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.robots_fetcher = robots_fetcher
+
+    @staticmethod
+    def domain(url):
+        host = urllib.parse.urlparse(url).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def _bucket(self, url):
+        domain = self.domain(url)
+        with self.lock:
+            bucket = self.buckets.get(domain)
+        if bucket is not None:
+            return bucket
+
+        # Read robots.txt outside the lock so other domains aren't held up
+        crawl_delay = self.crawl_delay(url) if RESPECT_ROBOTS else None
+        if crawl_delay:
+            bucket = DomainBucket(rate=1.0 / crawl_delay, max_rate=1.0 / crawl_delay, capacity=1)
+        else:
+            bucket = DomainBucket()
+        with self.lock:
+            return self.buckets.setdefault(domain, bucket)
+
+    def crawl_delay(self, url):
+        """Return the robots.txt Crawl-delay (or Request-rate) for a site, if any."""
+        if self.robots_fetcher is None:
+            return None
+        parsed = urllib.parse.urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        try:
+            response = self.robots_fetcher(robots_url)
+            if response.status_code != 200:
+                return None
+            parser = urllib.robotparser.RobotFileParser()
+            parser.parse(response.text.splitlines())
+        except Exception:
+            return None
+        delay = parser.crawl_delay(ROBOTS_USER_AGENT)
+        if delay:
+            return float(delay)
+        request_rate = parser.request_rate(ROBOTS_USER_AGENT)
+        if request_rate and request_rate.requests:
+            return request_rate.seconds / request_rate.requests
+        return None
+
+    def acquire(self, url):
+        """Wait until a request to this URL's domain is allowed."""
+        bucket = self._bucket(url)
+        while True:
+            wait = bucket.try_take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def record(self, url, latency, status=None, retry_after=None):
+        """Adjust the domain's rate after a request.
+
+        status is None when the request failed without a response.
+        """
+        bucket = self._bucket(url)
+        if status in THROTTLE_STATUSES:
+            bucket.slow_down(pause=retry_after or THROTTLE_PAUSE)
+        elif status is None or latency > SLOW_LATENCY:
+            bucket.slow_down()
+        elif latency < FAST_LATENCY:
+            bucket.speed_up()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# Function to get the process-wide scheduler
+def get_scheduler(robots_fetcher=None):
+    """Return the shared DomainScheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = DomainScheduler(robots_fetcher)
+    return _scheduler
@@ -1,176 +1,566 @@
-import requests
 from bs4 import BeautifulSoup
-import pandas as pd
-import time
+from collections import deque
+import csv
+import hashlib
+import os
 import re
 import urllib.parse
+import asyncio
+from http_session import fetch, AsyncFetcher, configure_cache
+from page_parsers import parse_company_cards, parse_business_details, parse_total_pages
+from metrics import configure_metrics, get_metrics, timed
 
 # Define the base URL for the business directory
 BASE_URL = "https://business.ycea-pa.org/list/ql/business-personal-professional-services-1401"
+# Directory index that links to every category, for full-directory crawls
+DIRECTORY_INDEX_URL = "https://business.ycea-pa.org/list"
 # Set headers to mimic a browser request
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
 }
 
+# Output file and its columns, in order
+OUTPUT_CSV = "ycea_business_directory.csv"
+COLUMNS = ["Name", "Address", "Phone", "Website", "Category", "Email", "Detail_URL", "Fingerprint", "Listing_Status"]
+WRITE_BATCH_SIZE = 25  # Rows buffered before they are flushed to disk
+
+# Limits for the async crawl mode
+MAX_CONCURRENCY = 10  # Total requests in flight at once
+PER_HOST_LIMIT = 4  # Requests in flight to any single host
+
 # Function to get the total number of pages
 def get_total_pages(url):
-    response = requests.get(url, headers=HEADERS)
-    soup = BeautifulSoup(response.text, "html.parser")
-    # Find the pagination section and extract the last page number
-    pagination = soup.find("ul", class_="pagination")
-    if pagination:
-        pages = pagination.find_all("a")
-        page_numbers = [int(page.text) for page in pages if page.text.isdigit()]
-        return max(page_numbers) if page_numbers else 1  # Return max page number found
-    return 1  # Default to 1 if no pagination is found
+    response = fetch(url, headers=HEADERS)
+    return parse_total_pages(response.text)
+
+# Function to find every category listing linked from the directory index
+def parse_category_links(html, index_url=DIRECTORY_INDEX_URL):
+    """Return the unique /list/ql/ category URLs on a page, in page order."""
+    soup = BeautifulSoup(html, "html.parser")
+    categories = []
+    for link in soup.find_all("a", href=True):
+        url = urllib.parse.urljoin(index_url, link["href"])
+        parsed = urllib.parse.urlparse(url)
+        if "/list/ql/" not in parsed.path:
+            continue
+        url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+        if url not in categories:
+            categories.append(url)
+    return categories
 
 # Function to extract data from the detail page
+@timed("get_business_details")
 def get_business_details(detail_url):
     try:
-        response = requests.get(detail_url, headers=HEADERS)
+        response = fetch(detail_url, headers=HEADERS)
         if response.status_code != 200:
             print(f"Failed to fetch detail page: {detail_url}")
             return None, None, None
         
-        detail_soup = BeautifulSoup(response.text, "html.parser")
-        
-        # Extract category
-        category_section = detail_soup.find("div", class_="gz-details-categories")
-        category = None
-        if category_section:
-            cat_span = category_section.find("span", class_="gz-cat")
-            if cat_span:
-                category = cat_span.text.strip().replace('"', '').replace("::after", "")
-        
-        # Try to find website if not found on main page
-        website = None
-        website_link = detail_soup.find("li", class_="gz-card-website")
-        if website_link and website_link.find("a"):
-            website = website_link.find("a").get("href", "").strip()
-        
-        # Try to find email through contact form link
-        email = None
-        email_link = detail_soup.find("a", class_="card-link", id="gz-directory-contact")
-        if email_link:
-            # Unfortunately, we can't directly get the email from the contact form
-            # This would require form submission or JavaScript execution
-            # For this example, we'll store the contact form URL instead
-            email = "Contact form available"
-            
-        return category, website, email
+        return parse_business_details(response.text)
     except Exception as e:
         print(f"Error fetching details: {e}")
         return None, None, None
 
-# Function to scrape company data from a page
-def scrape_companies(url):
-    response = requests.get(url, headers=HEADERS)
+# Function to fingerprint the listing fields of a card
+def card_fingerprint(card):
+    """Return a short hash of the card's name, address, phone and website."""
+    fields = [" ".join(str(card.get(field) or "").split()).lower() for field in ("Name", "Address", "Phone", "Website")]
+    return hashlib.blake2b("\x1f".join(fields).encode("utf-8"), digest_size=8).hexdigest()
+
+# Function to merge detail page data into a card
+def build_company_record(card, category=None, detail_website=None, email=None):
+    """Combine listing card fields with detail page fields into one row."""
+    website = card["Website"]
+    # Use detail page website if main page website is missing
+    if not website and detail_website:
+        website = detail_website
+    
+    return {
+        "Name": card["Name"],
+        "Address": card["Address"],
+        "Phone": card["Phone"],
+        "Website": website,
+        "Category": category,
+        "Email": email,
+        "Detail_URL": card["Detail_URL"],
+        "Fingerprint": card_fingerprint(card)
+    }
+
+# Function to get the cards of one listing page
+def fetch_page_cards(url):
+    """Return the card dicts on a listing page, or None if it couldn't be fetched."""
+    response = fetch(url, headers=HEADERS)
     if response.status_code != 200:
         print(f"Failed to fetch page: {url}")
-        return []
+        return None
+    with get_metrics().timer("parse_listing"):
+        return parse_company_cards(response.text)
+
+# Function to stream the cards of one listing page
+def iter_page_cards(url):
+    """Yield the card dicts found on a listing page."""
+    yield from fetch_page_cards(url) or []
+
+# Function to stream cards from consecutive listing pages
+def iter_listing_cards(base_url, pages_to_scrape, tracker=None):
+    """Yield cards from pages 1..pages_to_scrape, stopping at the first empty page.
     
-    soup = BeautifulSoup(response.text, "html.parser")
-    company_cards = soup.find_all("div", class_="gz-card-top")  # Find all company card top sections
-    company_data = []
+    Pages that fail to load are skipped and reported to the tracker.
+    """
+    for page_num in range(1, pages_to_scrape + 1):
+        page_url = f"{base_url}?page={page_num}"
+        print(f"Scraping page {page_num} of {pages_to_scrape}...")
+        cards = fetch_page_cards(page_url)
+        if cards is None:
+            if tracker is not None:
+                tracker.page_failed(page_url)
+            continue
+        yield from cards
+        
+        if not cards:
+            print("No more companies found. Stopping scraping.")
+            if tracker is not None and page_num < pages_to_scrape:
+                tracker.page_failed(page_url)  # The pages after it were never looked at
+            break  # Stops early if no data is found on a page
+        print(f"Collected {len(cards)} companies from page {page_num}")
+
+# Function to turn a stream of cards into full records
+def iter_company_records(cards, tracker=None):
+    """Yield a full record for each card, fetching its detail page.
     
-    for card in company_cards:
+    With a ListingTracker, unchanged cards reuse their previous row instead.
+    """
+    for card in cards:
+        if tracker is not None:
+            status, previous = tracker.classify(card)
+            if status == "unchanged":
+                yield tracker.unchanged(previous)
+                continue
         try:
-            # Extract name and detail page URL
-            name_tag = card.find("h5", class_="card-title")
-            name = None
-            detail_url = None
-            
-            if name_tag and name_tag.find("a"):
-                name_link = name_tag.find("a")
-                name = name_link.text.strip()
-                detail_url = name_link.get("href")
-                if detail_url and not detail_url.startswith("http"):
-                    detail_url = urllib.parse.urljoin("https://business.ycea-pa.org", detail_url)
-            
-            # Find the corresponding body section
-            body_div = card.find_next_sibling("div", class_="card-body")
-            
-            address = None
-            phone = None
-            website = None
-            
-            if body_div:
-                # Extract address
-                address_li = body_div.find("li", class_="gz-card-address")
-                if address_li:
-                    address = address_li.text.strip()
-                
-                # Extract phone number
-                phone_li = body_div.find("li", class_="gz-card-phone")
-                if phone_li:
-                    phone = phone_li.text.strip()
-                
-                # Extract website
-                website_li = body_div.find("li", class_="gz-card-website")
-                if website_li and website_li.find("a"):
-                    website = website_li.find("a").get("href", "").strip()
-            
             # Get additional details from the detail page
             category = None
             detail_website = None
             email = None
             
-            if detail_url:
-                print(f"Fetching details for: {name} from {detail_url}")
-                category, detail_website, email = get_business_details(detail_url)
-                # Use detail page website if main page website is missing
-                if not website and detail_website:
-                    website = detail_website
-                
-                # Add a small delay between detail page requests
-                time.sleep(1)
+            if card["Detail_URL"]:
+                print(f"Fetching details for: {card['Name']} from {card['Detail_URL']}")
+                category, detail_website, email = get_business_details(card["Detail_URL"])
             
-            company_data.append({
-                "Name": name,
-                "Address": address,
-                "Phone": phone,
-                "Website": website,
-                "Category": category,
-                "Email": email,
-                "Detail_URL": detail_url
-            })
+            record = build_company_record(card, category, detail_website, email)
+            yield tracker.mark(record, status) if tracker is not None else record
             
         except Exception as e:
             print(f"Error scraping a company: {e}")
+
+# Function to scrape company data from a page
+def scrape_companies(url):
+    return list(iter_company_records(iter_page_cards(url)))
+
+# CSV writer that flushes rows to disk in small batches
+class CsvBatchWriter:
+    """Write records to a CSV incrementally so partial results survive a crash.
+    
+    Rows go to <path>.partial, which replaces path only once the writer is
+    closed cleanly, so a crash never overwrites the last complete CSV.
+    """
     
-    return company_data
+    def __init__(self, path, fieldnames=COLUMNS, batch_size=WRITE_BATCH_SIZE):
+        self.path = path
+        self.partial_path = path + ".partial"
+        self.batch_size = batch_size
+        self.file = open(self.partial_path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction="ignore")
+        self.writer.writeheader()
+        self.buffer = []
+        self.count = 0
+    
+    def write(self, record):
+        self.buffer.append(record)
+        self.count += 1
+        get_metrics().count("rows")
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+    
+    @timed("csv_write")
+    def flush(self):
+        self.writer.writerows(self.buffer)
+        self.buffer = []
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    
+    def close(self, complete=True):
+        """Flush and close; a complete file then replaces the output."""
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        if complete:
+            os.replace(self.partial_path, self.path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # After an error the rows so far are kept in the .partial file only
+        self.close(complete=exc_type is None)
 
-# Main function to control the scraping process
-def main():
-    # Get total number of pages before scraping
-    total_pages = get_total_pages(BASE_URL)
-    print(f"Total Pages Found: {total_pages}")
+# Comparison of this crawl's cards against the previous dataset
+class ListingTracker:
+    """Sort cards into new, changed and unchanged listings against a previous CSV."""
     
-    # For testing, you might want to limit to fewer pages initially
-    pages_to_scrape = min(total_pages, 3)  # Change to total_pages for full scrape
+    def __init__(self, previous_rows=()):
+        self.previous = {}
+        for row in previous_rows:
+            row = dict(row)
+            if row.get("Listing_Status") == "removed":
+                continue  # Gone last time too; it comes back as new if it reappears
+            # Datasets from before fingerprints were stored get one computed
+            row["Fingerprint"] = row.get("Fingerprint") or card_fingerprint(row)
+            self.previous[self.key(row)] = row
+        self.seen = set()
+        self.failed_pages = []  # Listing pages this crawl couldn't read
+        self.counts = {"new": 0, "changed": 0, "unchanged": 0, "removed": 0, "not_crawled": 0}
     
-    # Scrape multiple pages with proper stopping condition
-    all_companies = []
-    for page_num in range(1, pages_to_scrape + 1):
-        page_url = f"{BASE_URL}?page={page_num}"
-        print(f"Scraping page {page_num} of {pages_to_scrape}...")
-        page_data = scrape_companies(page_url)
+    @classmethod
+    def from_csv(cls, path):
+        """Load the previous dataset; a missing file means every listing is new."""
+        if not os.path.exists(path):
+            print(f"No previous dataset at '{path}', every listing counts as new")
+            return cls()
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(csv.DictReader(f))
+    
+    @staticmethod
+    def key(row):
+        return row.get("Detail_URL") or row.get("Name")
+    
+    def classify(self, card):
+        """Return (status, previous row or None) for a card from this crawl."""
+        key = self.key(card)
+        self.seen.add(key)
+        previous = self.previous.get(key)
+        if previous is None:
+            return "new", None
+        if previous["Fingerprint"] != card_fingerprint(card):
+            return "changed", previous
+        return "unchanged", previous
+    
+    def page_failed(self, url):
+        self.failed_pages.append(url)
+    
+    def mark(self, record, status):
+        record["Listing_Status"] = status
+        self.counts[status] += 1
+        return record
+    
+    def unchanged(self, previous):
+        return self.mark(dict(previous), "unchanged")
+    
+    def removed(self, complete=True):
+        """Yield the previous rows whose listing wasn't seen in this crawl.
         
-        if not page_data:
-            print("No more companies found. Stopping scraping.")
-            break  # Stops early if no data is found on a page
+        When the crawl only covered some pages (complete=False) or a listing
+        page failed to load, those rows weren't looked for, so they are
+        carried over as they were.
+        """
+        complete = complete and not self.failed_pages
+        for key, row in self.previous.items():
+            if key in self.seen:
+                continue
+            if complete:
+                yield self.mark(dict(row), "removed")
+            else:
+                self.counts["not_crawled"] += 1
+                yield dict(row)
+
+# Compact set of already-seen businesses
+class SeenSet:
+    """Remember keys as 8-byte digests instead of full URL strings."""
+    
+    def __init__(self):
+        self.digests = set()
+    
+    def add(self, key):
+        """Add a key; return True if it wasn't seen before."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        if digest in self.digests:
+            return False
+        self.digests.add(digest)
+        return True
+    
+    def __len__(self):
+        return len(self.digests)
+
+# Queue of listing pages still to crawl
+class CrawlFrontier:
+    """FIFO of listing page URLs that never hands out the same page twice."""
+    
+    def __init__(self):
+        self.queue = deque()
+        self.seen = set()
+    
+    def add(self, url):
+        if url not in self.seen:
+            self.seen.add(url)
+            self.queue.append(url)
+    
+    def pop(self):
+        return self.queue.popleft()
+    
+    def __len__(self):
+        return len(self.queue)
+
+# Function to queue the remaining pages of a category after its first page
+def enqueue_category_pages(frontier, category_url, html, max_pages=None):
+    """Add pages 2..N of a category to the frontier."""
+    total_pages = parse_total_pages(html)
+    if max_pages:
+        total_pages = min(total_pages, max_pages)
+    for page_num in range(2, total_pages + 1):
+        frontier.add(f"{category_url}?page={page_num}")
+    return total_pages
+
+# Function to drop cards for businesses already crawled under another category
+def is_new_business(seen, card):
+    """Return True the first time a Detail_URL is seen (cards without one always pass)."""
+    return not card["Detail_URL"] or seen.add(card["Detail_URL"])
+
+# Function to stream cards from every category in the directory
+def iter_directory_cards(index_url=DIRECTORY_INDEX_URL, max_pages=None, tracker=None):
+    """Yield each business card in the directory once, across all categories.
+    
+    Pages that fail to load are skipped and reported to the tracker.
+    """
+    response = fetch(index_url, headers=HEADERS)
+    if response.status_code != 200 and tracker is not None:
+        tracker.page_failed(index_url)
+    frontier = CrawlFrontier()
+    for category_url in parse_category_links(response.text, index_url):
+        frontier.add(category_url)
+    print(f"Found {len(frontier)} categories")
+    
+    seen = SeenSet()
+    while frontier:
+        page_url = frontier.pop()
+        print(f"Scraping {page_url} ({len(frontier)} pages queued, {len(seen)} businesses seen)")
+        response = fetch(page_url, headers=HEADERS)
+        if response.status_code != 200:
+            print(f"Failed to fetch page: {page_url}")
+            if tracker is not None:
+                tracker.page_failed(page_url)
+            continue
+        
+        # The first page of a category tells us how many pages follow
+        if "?page=" not in page_url:
+            enqueue_category_pages(frontier, page_url, response.text, max_pages)
+        
+        for card in parse_company_cards(response.text):
+            if is_new_business(seen, card):
+                yield card
+
+# Function to fetch one detail page and build the full record
+async def enrich_card_async(fetcher, card):
+    """Fetch a card's detail page and return the merged record."""
+    category, detail_website, email = None, None, None
+    if card["Detail_URL"]:
+        print(f"Fetching details for: {card['Name']} from {card['Detail_URL']}")
+        try:
+            with get_metrics().timer("get_business_details"):
+                response = await fetcher.get(card["Detail_URL"], headers=HEADERS)
+                if response.status_code == 200:
+                    category, detail_website, email = parse_business_details(response.text)
+            if response.status_code != 200:
+                print(f"Failed to fetch detail page: {card['Detail_URL']}")
+        except Exception as e:
+            print(f"Error fetching details: {e}")
+    return build_company_record(card, category, detail_website, email)
+
+# Function to build a card's record, skipping the detail fetch when the listing is unchanged
+async def refresh_card_async(fetcher, card, tracker=None):
+    if tracker is None:
+        return await enrich_card_async(fetcher, card)
+    status, previous = tracker.classify(card)
+    if status == "unchanged":
+        return tracker.unchanged(previous)
+    return tracker.mark(await enrich_card_async(fetcher, card), status)
+
+# Function to scrape one listing page and its detail pages concurrently
+async def scrape_companies_async(fetcher, url, writer, tracker=None):
+    """Fetch a listing page, then start its detail fetches right away.
+    
+    Each record goes to the writer as soon as its detail page is done.
+    Returns the number of records written.
+    """
+    try:
+        response = await fetcher.get(url, headers=HEADERS)
+    except Exception as e:
+        print(f"Error fetching page {url}: {e}")
+        response = None
+    if response is None or response.status_code != 200:
+        if response is not None:
+            print(f"Failed to fetch page: {url}")
+        if tracker is not None:
+            tracker.page_failed(url)
+        return 0
+    
+    # Detail fetches are scheduled as soon as this page is parsed,
+    # while other listing pages are still downloading
+    with get_metrics().timer("parse_listing"):
+        cards = parse_company_cards(response.text)
+    tasks = [asyncio.create_task(refresh_card_async(fetcher, card, tracker)) for card in cards]
+    for next_done in asyncio.as_completed(tasks):
+        writer.write(await next_done)
+    return len(tasks)
+
+# Function to crawl several listing pages concurrently
+async def crawl_async(base_url, pages_to_scrape, writer, concurrency=MAX_CONCURRENCY, per_host=PER_HOST_LIMIT,
+                      tracker=None):
+    """Crawl listing pages 1..pages_to_scrape and their detail pages concurrently."""
+    fetcher = AsyncFetcher(concurrency, per_host)
+    try:
+        page_urls = [f"{base_url}?page={page_num}" for page_num in range(1, pages_to_scrape + 1)]
+        counts = await asyncio.gather(*(scrape_companies_async(fetcher, url, writer, tracker) for url in page_urls))
+    finally:
+        fetcher.close()
+    
+    for page_num, count in enumerate(counts, start=1):
+        print(f"Collected {count} companies from page {page_num}")
+
+# Function to crawl the whole directory concurrently
+async def crawl_directory_async(index_url, writer, concurrency=MAX_CONCURRENCY, per_host=PER_HOST_LIMIT, max_pages=None,
+                                tracker=None):
+    """Crawl every category from the index, fetching each business once."""
+    fetcher = AsyncFetcher(concurrency, per_host)
+    frontier = CrawlFrontier()
+    seen = SeenSet()
+    
+    async def crawl_page(page_url):
+        try:
+            response = await fetcher.get(page_url, headers=HEADERS)
+        except Exception as e:
+            print(f"Error fetching page {page_url}: {e}")
+            response = None
+        if response is None or response.status_code != 200:
+            if response is not None:
+                print(f"Failed to fetch page: {page_url}")
+            if tracker is not None:
+                tracker.page_failed(page_url)
+            return
+        
+        # The first page of a category tells us how many pages follow
+        if "?page=" not in page_url:
+            enqueue_category_pages(frontier, page_url, response.text, max_pages)
+        
+        with get_metrics().timer("parse_listing"):
+            cards = [card for card in parse_company_cards(response.text) if is_new_business(seen, card)]
+        tasks = [asyncio.create_task(refresh_card_async(fetcher, card, tracker)) for card in cards]
+        for next_done in asyncio.as_completed(tasks):
+            writer.write(await next_done)
+    
+    try:
+        response = await fetcher.get(index_url, headers=HEADERS)
+        if response.status_code != 200 and tracker is not None:
+            tracker.page_failed(index_url)
+        for category_url in parse_category_links(response.text, index_url):
+            frontier.add(category_url)
+        print(f"Found {len(frontier)} categories")
+        
+        running = set()
+        while frontier or running:
+            # Keep only a few listing pages in flight, so cards wait on the
+            # frontier as URLs rather than in memory as pending detail fetches
+            while frontier and len(running) < concurrency:
+                running.add(asyncio.create_task(crawl_page(frontier.pop())))
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+            print(f"{len(frontier.seen)} pages found, {len(seen)} businesses seen, {writer.count} written")
+    finally:
+        fetcher.close()
+
+# Main function to control the scraping process
+def main(use_async=False, concurrency=MAX_CONCURRENCY, per_host=PER_HOST_LIMIT, offline=False, output_path=OUTPUT_CSV,
+         full_directory=False, max_pages=None, base_url=BASE_URL, index_url=DIRECTORY_INDEX_URL, incremental=False,
+         previous_path=None):
+    # Replay pages from the local cache instead of the network
+    if offline:
+        configure_cache(offline=True)
+        print("Offline mode: serving every page from the local cache")
+    
+    # Only fetch detail pages for listings that changed since the previous dataset
+    tracker = None
+    if incremental:
+        # Cached pages would hide the changes this run is looking for, so every
+        # cached page is revalidated (a conditional GET) instead of trusted
+        if not offline:
+            configure_cache(ttl=0)
+        tracker = ListingTracker.from_csv(previous_path or output_path)
+        print(f"Incremental mode: comparing against {len(tracker.previous)} previous listings")
+    
+    # Stage timings go next to the output, plus a report at the end
+    metrics = configure_metrics(os.path.splitext(output_path)[0] + "_metrics.jsonl")
+    try:
+        crawl(use_async, concurrency, per_host, output_path, full_directory, max_pages, base_url, index_url, tracker)
+    finally:
+        metrics.report("Directory scrape")
+        metrics.close()
+
+# Function to run the crawl main() asked for
+def crawl(use_async, concurrency, per_host, output_path, full_directory, max_pages, base_url=BASE_URL,
+          index_url=DIRECTORY_INDEX_URL, tracker=None):
+    # Records stream straight to the CSV as they are built
+    with CsvBatchWriter(output_path) as writer:
+        if full_directory:
+            complete = max_pages is None
+            # Crawl every category, fetching each business's detail page once
+            if use_async:
+                asyncio.run(crawl_directory_async(index_url, writer, concurrency, per_host, max_pages, tracker))
+            else:
+                for record in iter_company_records(iter_directory_cards(index_url, max_pages, tracker), tracker):
+                    writer.write(record)
+        else:
+            # Get total number of pages before scraping
+            total_pages = get_total_pages(base_url)
+            print(f"Total Pages Found: {total_pages}")
             
-        all_companies.extend(page_data)
-        print(f"Collected {len(page_data)} companies from page {page_num}")
+            # For testing, you might want to limit to fewer pages initially
+            pages_to_scrape = min(total_pages, 3)  # Change to total_pages for full scrape
+            complete = pages_to_scrape >= total_pages
+            
+            if use_async:
+                # Fetch listing and detail pages concurrently
+                print(f"Scraping {pages_to_scrape} pages concurrently (limit {concurrency}, {per_host} per host)...")
+                asyncio.run(crawl_async(base_url, pages_to_scrape, writer, concurrency, per_host, tracker))
+            else:
+                for record in iter_company_records(iter_listing_cards(base_url, pages_to_scrape, tracker), tracker):
+                    writer.write(record)
         
-        # Add delay between pages to be respectful
-        time.sleep(3)
+        if tracker is not None:
+            # Listings that disappeared stay in the dataset, marked as removed;
+            # a capped crawl or a failed listing page can't tell, so the rest of the old rows are kept as they were
+            for record in tracker.removed(complete):
+                writer.write(record)
     
-    # Save results to CSV file
-    df = pd.DataFrame(all_companies)
-    df.to_csv("ycea_business_directory.csv", index=False)
-    print(f"✅ Data saved to 'ycea_business_directory.csv' with {len(df)} entries.")
+    if tracker is not None:
+        counts = tracker.counts
+        print(f"Listings: {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged, "
+              f"{counts['removed']} removed, {counts['not_crawled']} not crawled "
+              f"({len(tracker.failed_pages)} listing pages failed)")
+    print(f"✅ Data saved to '{output_path}' with {writer.count} entries.")
 
 # Run the scraper
 if __name__ == "__main__":
+    # For a much faster crawl, fetch pages concurrently instead
+    # main(use_async=True, concurrency=10, per_host=4)
+    
+    # To re-run the parsers on the last crawl without any network access
+    # main(offline=True)
+    
+    # To crawl every category in the directory instead of just BASE_URL
+    # main(full_directory=True, use_async=True)
+    
+    # To refresh the last crawl, fetching detail pages only for new or changed listings
+    # main(incremental=True, use_async=True)
+    
     main()
\ No newline at end of file